@@ -95,6 +95,9 @@ async def startup_event():
     # Test database connection
     if test_connection():
         print("✅ Database connection successful")
+        if schedule:
+            from app.scheduler import jobs
+            jobs.recover_abandoned_jobs()
     else:
         print("❌ Database connection failed")
     
@@ -106,3 +109,6 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown"""
     print("👋 Shutting down Workforce Scheduling Platform API...")
+    if schedule:
+        from app.scheduler import jobs
+        jobs.shutdown()
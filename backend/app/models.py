@@ -3,7 +3,7 @@ SQLAlchemy ORM Models for Workforce Scheduling Platform
 These models map to the PostgreSQL tables in Supabase
 """
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Time, ForeignKey, Text, Numeric, DECIMAL, CheckConstraint, Uuid
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Time, ForeignKey, Text, Numeric, DECIMAL, CheckConstraint, UniqueConstraint, Index, Uuid, JSON, Float
 from sqlalchemy.dialects.postgresql import JSONB, INET
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
@@ -34,6 +34,7 @@ class User(Base):
     
     __table_args__ = (
         CheckConstraint("role IN ('student', 'admin')", name="check_user_role"),
+        Index("ix_users_created_at_id", "created_at", "id"),  # keyset pagination order
     )
 
     def __repr__(self):
@@ -127,6 +128,8 @@ class Availability(Base):
     
     __table_args__ = (
         CheckConstraint("preference_rank IS NULL OR (preference_rank >= 1 AND preference_rank <= 5)", name="check_preference_rank"),
+        # One row per student, shift and semester; conflict target of the bulk upsert
+        UniqueConstraint("user_id", "shift_id", "semester", name="uq_availability_user_shift_semester"),
     )
 
     def __repr__(self):
@@ -152,9 +155,11 @@ class Schedule(Base):
     generator = relationship("User", foreign_keys=[generated_by], back_populates="generated_schedules")
     assignments = relationship("ScheduleAssignment", back_populates="schedule", cascade="all, delete-orphan")
     conflicts = relationship("ScheduleConflict", back_populates="schedule", cascade="all, delete-orphan")
+    solver_run = relationship("SolverRun", back_populates="schedule", uselist=False, cascade="all, delete-orphan")
     
     __table_args__ = (
         CheckConstraint("status IN ('draft', 'published', 'archived')", name="check_schedule_status"),
+        Index("ix_schedules_created_at_id", "created_at", "id"),  # keyset pagination order
     )
 
     def __repr__(self):
@@ -189,6 +194,72 @@ class ScheduleAssignment(Base):
         return f"<ScheduleAssignment {self.user_id} -> {self.shift_id}>"
 
 
+class ScheduleJob(Base):
+    """Background solver jobs: schedule generation, repair and what-if scenarios"""
+    __tablename__ = "schedule_jobs"
+
+    id = Column(String(36), primary_key=True, autoincrement=False, default=lambda: str(uuid.uuid4()))
+    kind = Column(String(20), nullable=False, default="generate")  # 'generate', 'repair' or 'scenarios'
+    semester = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # 'queued', 'running', 'completed', 'failed', 'cancelled'
+    stage = Column(String(50))  # Current optimizer stage, e.g. 'loading', 'solving'
+    progress = Column(Integer, default=0)  # 0-100
+    cancel_requested = Column(Boolean, default=False)
+    options = Column(JSON)  # Optimizer keyword options from the request, e.g. solver_profile
+    schedule_id = Column(String(36), ForeignKey("schedules.id", ondelete="SET NULL"))
+    result = Column(JSON)  # Scenario jobs: comparative metrics per variant
+    requested_by = Column(String(36), ForeignKey("users.id"))
+    error = Column(Text)
+    error_code = Column(String(30))  # e.g. 'infeasible', 'memory_limit', 'cpu_limit', 'solver_crashed', 'abandoned'
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, index=True)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))  # Refreshed while the API process holding the job is alive
+
+    # Relationships
+    schedule = relationship("Schedule")
+
+    __table_args__ = (
+        CheckConstraint("status IN ('queued', 'running', 'completed', 'failed', 'cancelled')", name="check_job_status"),
+        CheckConstraint("progress >= 0 AND progress <= 100", name="check_job_progress"),
+    )
+
+    def __repr__(self):
+        return f"<ScheduleJob {self.semester} - {self.status}>"
+
+
+class SolverRun(Base):
+    """Solver telemetry for a generated schedule"""
+    __tablename__ = "solver_runs"
+
+    id = Column(String(36), primary_key=True, autoincrement=False, default=lambda: str(uuid.uuid4()))
+    schedule_id = Column(String(36), ForeignKey("schedules.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    semester = Column(String(50), nullable=False, index=True)
+    algorithm_version = Column(String(20))
+    status = Column(String(20))  # CP-SAT status name, e.g. 'OPTIMAL', 'FEASIBLE'; 'CACHED' for cache hits
+    objective = Column(Float)
+    best_bound = Column(Float)
+    gap = Column(Float)  # Relative gap between objective and best bound
+    students = Column(Integer)
+    shifts = Column(Integer)
+    availability_rows = Column(Integer)
+    variables = Column(Integer)
+    constraints = Column(Integer)
+    load_seconds = Column(Float)
+    build_seconds = Column(Float)
+    solve_seconds = Column(Float)
+    save_seconds = Column(Float)
+    build_timings = Column(JSON)  # Constraint family -> build time in ms
+    parameters = Column(JSON)  # Solver profile, workers, time limit, gap limit, options
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, index=True)
+
+    # Relationships
+    schedule = relationship("Schedule", back_populates="solver_run")
+
+    def __repr__(self):
+        return f"<SolverRun {self.schedule_id} - {self.status}>"
+
+
 class ScheduleConflict(Base):
     """Tracks scheduling conflicts and issues"""
     __tablename__ = "schedule_conflicts"
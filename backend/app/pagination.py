@@ -0,0 +1,54 @@
+# backend/app/pagination.py
+"""
+Keyset (cursor) pagination for list endpoints
+
+Pages are ordered on (created_at, id) and each page continues strictly after
+the last row of the previous one, so a page costs the same at any depth and
+rows inserted meanwhile do not shift later pages. The cursor is the last
+row's key, encoded as an opaque URL-safe string.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """(created_at, id) from a cursor; 400 if it was not produced by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_page(query: Query, model, cursor: str = None, limit: int = 100, descending: bool = False):
+    """
+    One page of query ordered on (model.created_at, model.id).
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    key = tuple_(model.created_at, model.id)
+    if cursor:
+        after = tuple_(*decode_cursor(cursor))
+        query = query.filter(key < after if descending else key > after)
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at, model.id)
+
+    # One extra row tells whether another page follows
+    items = query.limit(limit + 1).all()
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(items[-1].created_at, items[-1].id)
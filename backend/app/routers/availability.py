@@ -3,9 +3,13 @@
 Student availability API endpoints
 """
 
+import uuid
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import and_, case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, contains_eager
+from typing import List, Optional
 from uuid import UUID
 
 from app.database import get_db
@@ -153,61 +157,89 @@ def create_bulk_availability(
     """
     Create or update availability for multiple shifts at once
     This is the main endpoint students will use to submit their weekly availability
+    One query validates every shift id, and one INSERT ... ON CONFLICT writes every row
     """
-    created_count = 0
-    updated_count = 0
     errors = []
-    
+
+    # Last entry wins when a shift appears more than once
+    entries = {}
     for avail_data in bulk_data.availabilities:
         try:
-            # Parse and cast to string for DB
             shift_id = str(UUID(str(avail_data["shift_id"])))
-            is_available = avail_data.get("is_available", True)
             preference_rank = avail_data.get("preference_rank")
-            
-            # Verify shift exists
-            shift = db.query(Shift).filter(Shift.id == shift_id).first()
-            if not shift:
-                errors.append(f"Shift {shift_id} not found")
-                continue
-            
-            # Check if availability exists
-            existing = db.query(Availability).filter(
-                Availability.user_id == current_user.id,
-                Availability.shift_id == shift_id,
-                Availability.semester == bulk_data.semester
-            ).first()
-            
-            if existing:
-                # Update
-                existing.is_available = is_available
-                existing.preference_rank = preference_rank
-                updated_count += 1
-            else:
-                # Create
-                new_avail = Availability(
-                    user_id=current_user.id,
-                    shift_id=shift_id,
-                    is_available=is_available,
-                    preference_rank=preference_rank,
-                    semester=bulk_data.semester
-                )
-                db.add(new_avail)
-                created_count += 1
-        
+            if preference_rank is not None:
+                preference_rank = int(preference_rank)
+                if not 1 <= preference_rank <= 5:
+                    raise ValueError("preference_rank must be between 1 and 5")
+            entries[shift_id] = (avail_data.get("is_available", True), preference_rank)
         except Exception as e:
             errors.append(f"Error processing shift: {str(e)}")
-    
-    db.commit()
-    
+
+    # Which shifts exist, and which already have a row for this student and semester
+    existing = {}
+    if entries:
+        existing = dict(db.query(Shift.id, Availability.id).outerjoin(
+            Availability,
+            and_(
+                Availability.shift_id == Shift.id,
+                Availability.user_id == current_user.id,
+                Availability.semester == bulk_data.semester
+            )
+        ).filter(Shift.id.in_(entries)).all())
+
+    now = datetime.utcnow()
+    rows = []
+    for shift_id, (is_available, preference_rank) in entries.items():
+        if shift_id not in existing:
+            errors.append(f"Shift {shift_id} not found")
+            continue
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "user_id": current_user.id,
+            "shift_id": shift_id,
+            "is_available": is_available,
+            "preference_rank": preference_rank,
+            "semester": bulk_data.semester,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    if rows:
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        statement = insert(Availability.__table__).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "shift_id", "semester"],
+            set_={
+                "is_available": statement.excluded.is_available,
+                "preference_rank": statement.excluded.preference_rank,
+                "updated_at": statement.excluded.updated_at,
+            }
+        )
+        db.execute(statement)
+        db.commit()
+
+    updated_count = sum(1 for row in rows if existing[row["shift_id"]] is not None)
     return {
         "success": True,
-        "created": created_count,
+        "created": len(rows) - updated_count,
         "updated": updated_count,
         "errors": errors
     }
 
 
+def load_availability_with_shifts(db: Session, user_id: str, semester: str) -> List[Availability]:
+    """
+    A student's availability for a semester with each row's shift,
+    fetched in one joined query
+    """
+    return db.query(Availability).join(Availability.shift).options(
+        contains_eager(Availability.shift)
+    ).filter(
+        Availability.user_id == user_id,
+        Availability.semester == semester
+    ).order_by(Shift.day_of_week, Shift.start_time).all()
+
+
 @router.get("/my-availability/{semester}", response_model=List[AvailabilityWithShift])
 def get_my_availability(
     semester: str,
@@ -218,29 +250,7 @@ def get_my_availability(
     Get current user's availability for all shifts in a semester
     Returns availability with shift details
     """
-    availabilities = db.query(Availability).filter(
-        Availability.user_id == current_user.id,
-        Availability.semester == semester
-    ).all()
-    
-    # Load shift relationships
-    result = []
-    for avail in availabilities:
-        shift = db.query(Shift).filter(Shift.id == avail.shift_id).first()
-        avail_dict = {
-            "id": avail.id,
-            "user_id": avail.user_id,
-            "shift_id": avail.shift_id,
-            "is_available": avail.is_available,
-            "preference_rank": avail.preference_rank,
-            "semester": avail.semester,
-            "created_at": avail.created_at,
-            "updated_at": avail.updated_at,
-            "shift": shift
-        }
-        result.append(avail_dict)
-    
-    return result
+    return load_availability_with_shifts(db, current_user.id, semester)
 
 
 @router.get("/student/{student_id}/{semester}", response_model=List[AvailabilityWithShift])
@@ -253,28 +263,7 @@ def get_student_availability(
     """
     Get a student's availability (Admin only)
     """
-    availabilities = db.query(Availability).filter(
-        Availability.user_id == str(student_id),
-        Availability.semester == semester
-    ).all()
-    
-    result = []
-    for avail in availabilities:
-        shift = db.query(Shift).filter(Shift.id == avail.shift_id).first()
-        avail_dict = {
-            "id": avail.id,
-            "user_id": avail.user_id,
-            "shift_id": avail.shift_id,
-            "is_available": avail.is_available,
-            "preference_rank": avail.preference_rank,
-            "semester": avail.semester,
-            "created_at": avail.created_at,
-            "updated_at": avail.updated_at,
-            "shift": shift
-        }
-        result.append(avail_dict)
-    
-    return result
+    return load_availability_with_shifts(db, str(student_id), semester)
 
 
 @router.delete("/{availability_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -313,35 +302,34 @@ def delete_availability(
 @router.get("/summary/{semester}")
 def get_availability_summary(
     semester: str,
+    day_of_week: Optional[int] = Query(None, ge=0, le=6),
+    shift_type: Optional[str] = Query(None, pattern="^(weekday|weekend|rotating)$"),
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
     """
     Get availability summary for all students (Admin only)
     Shows how many students are available for each shift
+    Computed in one GROUP BY query; optionally filtered by day_of_week and shift_type
     """
-    from sqlalchemy import func
-    
-    # Get all shifts
-    shifts = db.query(Shift).filter(Shift.is_active == True).all()
-    
+    # Conditional aggregates over the shift's availability rows for the semester
+    available_count = func.count(case((Availability.is_available == True, Availability.id)))
+    top_pref_count = func.count(case(
+        (and_(Availability.is_available == True, Availability.preference_rank == 1), Availability.id)
+    ))
+
+    query = db.query(Shift, available_count, top_pref_count).outerjoin(
+        Availability,
+        and_(Availability.shift_id == Shift.id, Availability.semester == semester)
+    ).filter(Shift.is_active == True)
+    if day_of_week is not None:
+        query = query.filter(Shift.day_of_week == day_of_week)
+    if shift_type is not None:
+        query = query.filter(Shift.shift_type == shift_type)
+    rows = query.group_by(Shift.id).order_by(Shift.day_of_week, Shift.start_time).all()
+
     summary = []
-    for shift in shifts:
-        # Count available students
-        available_count = db.query(func.count(Availability.id)).filter(
-            Availability.shift_id == shift.id,
-            Availability.semester == semester,
-            Availability.is_available == True
-        ).scalar()
-        
-        # Count students who marked it as top preference
-        top_pref_count = db.query(func.count(Availability.id)).filter(
-            Availability.shift_id == shift.id,
-            Availability.semester == semester,
-            Availability.is_available == True,
-            Availability.preference_rank == 1
-        ).scalar()
-        
+    for shift, available, top_preference in rows:
         summary.append({
             "shift": {
                 "id": shift.id,
@@ -350,14 +338,14 @@ def get_availability_summary(
                 "end_time": str(shift.end_time),
                 "shift_type": shift.shift_type
             },
-            "available_students": available_count,
-            "top_preference_count": top_pref_count,
+            "available_students": available,
+            "top_preference_count": top_preference,
             "required_students": shift.required_students,
-            "is_adequately_staffed": available_count >= shift.required_students
+            "is_adequately_staffed": available >= shift.required_students
         })
-    
+
     return {
         "semester": semester,
         "shifts": summary,
-        "total_shifts": len(shifts)
+        "total_shifts": len(rows)
     }
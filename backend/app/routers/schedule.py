@@ -1,11 +1,14 @@
-from typing import List
+from typing import List, Optional, Union
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 from .. import models, schemas, database
 from app.auth import get_current_admin_user, get_current_active_user
-from ..scheduler import optimizer
+from app.pagination import keyset_page
+from ..scheduler import jobs, optimizer
 
 router = APIRouter(
     prefix="/schedules",
@@ -13,32 +16,150 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-@router.post("/generate", response_model=schemas.ScheduleResponse, status_code=status.HTTP_201_CREATED)
+# Assignments fetched per round trip when streaming
+ASSIGNMENT_STREAM_BATCH = 500
+
+@router.post("/generate", response_model=schemas.ScheduleJobResponse, status_code=status.HTTP_202_ACCEPTED)
 def generate_schedule_endpoint(
     schedule_req: schemas.ScheduleCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_admin_user)
 ):
     """
-    Trigger schedule generation. 
-    Warning: This is a blocking operation in this simple implementation.
+    Queue schedule generation.
+    Returns a job immediately; poll /schedules/jobs/{job_id} for progress and the resulting schedule id.
+    A request identical to one still queued or running returns that job instead of starting another.
     """
-    schedule = optimizer.generate_schedule(db, schedule_req.semester, str(current_user.id))
-    if not schedule:
-        raise HTTPException(status_code=400, detail="Could not generate a valid schedule (infeasible constraints)")
-    
-    return schedule
+    # Refuse semesters with nothing to schedule; the job runs the full diagnostics
+    errors = optimizer.precheck_semester(db, schedule_req.semester)
+    if errors:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "Schedule inputs are not solvable", "errors": errors}
+        )
+
+    if schedule_req.warm_start_schedule_id:
+        hint_schedule = db.query(models.Schedule).filter(
+            models.Schedule.id == str(schedule_req.warm_start_schedule_id)
+        ).first()
+        if not hint_schedule:
+            raise HTTPException(status_code=404, detail="Warm-start schedule not found")
+
+    # Identical concurrent requests share one solve
+    job, created = jobs.find_or_create_generation_job(
+        db, schedule_req.semester, schedule_req.optimizer_options(), str(current_user.id)
+    )
+    if created:
+        jobs.submit_generation_job(job)
+    return job
+
+@router.get("/diagnostics/{semester}", response_model=schemas.ScheduleDiagnostics)
+def get_schedule_diagnostics(
+    semester: str,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Pre-solve feasibility diagnostics for a semester:
+    understaffed shifts, per-day capacity shortfalls and unreachable desired hours.
+    """
+    return optimizer.diagnose_semester(db, semester)
+
+@router.post("/scenarios", response_model=schemas.ScheduleJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def compare_scenarios(
+    scenario_req: schemas.ScenarioRequest,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Queue what-if variants, solved side by side against one load of the semester's data.
+    Returns a job; poll /schedules/jobs/{job_id} until its result holds the comparison.
+    Nothing is saved unless persist_variant names a variant to keep as a draft (the job's schedule_id).
+    """
+    names = [variant.name for variant in scenario_req.variants]
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Variant names must be unique")
+    if scenario_req.persist_variant and scenario_req.persist_variant not in names:
+        raise HTTPException(status_code=400, detail="persist_variant does not name a variant")
+
+    job, created = jobs.find_or_create_generation_job(
+        db, scenario_req.semester, scenario_req.scenario_options(), str(current_user.id),
+        kind=jobs.KIND_SCENARIOS
+    )
+    if created:
+        jobs.submit_generation_job(job)
+    return job
+
+@router.get("/jobs/{job_id}", response_model=schemas.ScheduleJobResponse)
+def get_generation_job(
+    job_id: UUID,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    job = db.query(models.ScheduleJob).filter(models.ScheduleJob.id == str(job_id)).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/jobs/{job_id}/cancel", response_model=schemas.ScheduleJobResponse)
+def cancel_generation_job(
+    job_id: UUID,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Cancel a queued or running job.
+    Queued jobs, and running jobs whose API process is gone, are cancelled
+    immediately; other running jobs stop at the next cancellation check.
+    """
+    job = db.query(models.ScheduleJob).filter(models.ScheduleJob.id == str(job_id)).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status not in jobs.ACTIVE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+
+    job.cancel_requested = True
+    if job.status == "queued" or jobs.is_abandoned(job):
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    db.commit()
+    db.refresh(job)
+    return job
 
-@router.get("/", response_model=List[schemas.ScheduleResponse])
+def filter_schedules(query, schedule_status: Optional[str], semester: Optional[str]):
+    if schedule_status is not None:
+        query = query.filter(models.Schedule.status == schedule_status)
+    if semester is not None:
+        query = query.filter(models.Schedule.semester == semester)
+    return query
+
+@router.get("/", response_model=schemas.SchedulePage)
 def list_schedules(
-    skip: int = 0, 
-    limit: int = 100, 
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    schedule_status: Optional[str] = Query(None, alias="status"),
+    semester: Optional[str] = None,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Schedules, newest first, optionally only those with the given status
+    and/or semester; pass next_cursor back as cursor for the following page
+    """
+    query = filter_schedules(db.query(models.Schedule), schedule_status, semester)
+    schedules, next_cursor = keyset_page(query, models.Schedule, cursor, limit, descending=True)
+    return {"items": schedules, "next_cursor": next_cursor}
+
+@router.get("/count", response_model=schemas.CountResponse)
+def count_schedules(
+    schedule_status: Optional[str] = Query(None, alias="status"),
+    semester: Optional[str] = None,
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    schedules = db.query(models.Schedule).order_by(models.Schedule.created_at.desc()).offset(skip).limit(limit).all()
-    return schedules
+    """Number of schedules matching the same filters as the list"""
+    query = filter_schedules(db.query(func.count(models.Schedule.id)), schedule_status, semester)
+    return {"count": query.scalar()}
 
 @router.get("/{schedule_id}", response_model=schemas.ScheduleResponse)
 def get_schedule(
@@ -51,15 +172,112 @@ def get_schedule(
         raise HTTPException(status_code=404, detail="Schedule not found")
     return schedule
 
-@router.get("/{schedule_id}/assignments", response_model=List[schemas.ScheduleAssignmentDetailed])
+def assignment_query(db: Session, schedule_id: str):
+    """A schedule's assignments with their shift and user joined into the same query"""
+    return db.query(models.ScheduleAssignment).options(
+        joinedload(models.ScheduleAssignment.shift),
+        joinedload(models.ScheduleAssignment.user)
+    ).filter(models.ScheduleAssignment.schedule_id == schedule_id)
+
+def compact_assignments(assignments) -> dict:
+    """Assignments without nesting, plus each referenced shift and user once"""
+    shifts, users = {}, {}
+    for assignment in assignments:
+        shifts.setdefault(assignment.shift_id, assignment.shift)
+        users.setdefault(assignment.user_id, assignment.user)
+    return {"assignments": assignments, "shifts": list(shifts.values()), "users": list(users.values())}
+
+def stream_assignments(schedule_id: str, compact: bool):
+    """
+    JSON body of the assignments endpoint, written as batches arrive.
+    Uses a session of its own: the request's session is closed before streaming starts.
+    """
+    db = database.SessionLocal()
+    try:
+        shifts, users = {}, {}
+        yield '{"assignments":[' if compact else '['
+        rows = assignment_query(db, schedule_id).yield_per(ASSIGNMENT_STREAM_BATCH)
+        for i, assignment in enumerate(rows):
+            if compact:
+                shifts.setdefault(assignment.shift_id, assignment.shift)
+                users.setdefault(assignment.user_id, assignment.user)
+                body = schemas.ScheduleAssignmentResponse.model_validate(assignment).model_dump_json()
+            else:
+                body = schemas.ScheduleAssignmentDetailed.model_validate(assignment).model_dump_json()
+            yield f",{body}" if i else body
+        if compact:
+            yield '],"shifts":['
+            yield ",".join(schemas.ShiftResponse.model_validate(shift).model_dump_json() for shift in shifts.values())
+            yield '],"users":['
+            yield ",".join(schemas.UserResponse.model_validate(user).model_dump_json() for user in users.values())
+            yield ']}'
+        else:
+            yield ']'
+    finally:
+        db.close()
+
+@router.get(
+    "/{schedule_id}/assignments",
+    response_model=Union[List[schemas.ScheduleAssignmentDetailed], schemas.ScheduleAssignmentsCompact]
+)
 def get_schedule_assignments(
     schedule_id: UUID,
+    compact: bool = False,
+    stream: bool = False,
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    assignments = db.query(models.ScheduleAssignment).filter(models.ScheduleAssignment.schedule_id == str(schedule_id)).all()
+    """
+    Assignments of a schedule with their shifts and users, loaded in one query.
+    compact=true lists each shift and user once next to flat assignments instead of nesting them;
+    stream=true writes the same JSON incrementally, for schedules with thousands of assignments.
+    """
+    if stream:
+        return StreamingResponse(stream_assignments(str(schedule_id), compact), media_type="application/json")
+    assignments = assignment_query(db, str(schedule_id)).all()
+    if compact:
+        return compact_assignments(assignments)
     return assignments
 
+@router.get("/{schedule_id}/solver-run", response_model=schemas.SolverRunResponse)
+def get_schedule_solver_run(
+    schedule_id: UUID,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """Solver telemetry (timings, model size, status, bound and parameters) for a schedule"""
+    solver_run = db.query(models.SolverRun).filter(models.SolverRun.schedule_id == str(schedule_id)).first()
+    if not solver_run:
+        raise HTTPException(status_code=404, detail="No solver run recorded for this schedule")
+    return solver_run
+
+@router.post("/{schedule_id}/repair", response_model=schemas.ScheduleJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def repair_schedule_endpoint(
+    schedule_id: UUID,
+    repair_req: schemas.ScheduleRepairRequest,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Queue a repair of a schedule after availability or shift changes.
+    Untouched assignments are kept; only the affected shifts are re-solved.
+    Returns a job; its schedule_id is the new draft once it completes.
+    """
+    if not repair_req.shift_ids and not repair_req.student_ids:
+        raise HTTPException(status_code=400, detail="Provide at least one changed shift or student")
+
+    base_schedule = db.query(models.Schedule).filter(models.Schedule.id == str(schedule_id)).first()
+    if not base_schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    job, created = jobs.find_or_create_generation_job(
+        db, base_schedule.semester, repair_req.repair_options(base_schedule.id), str(current_user.id),
+        kind=jobs.KIND_REPAIR
+    )
+    if created:
+        jobs.submit_generation_job(job)
+    return job
+
 @router.post("/{schedule_id}/publish", response_model=schemas.ScheduleResponse)
 def publish_schedule(
     schedule_id: UUID,
@@ -4,31 +4,33 @@ Student management API endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 from uuid import UUID
 
 from app.database import get_db
 from app.models import User
-from app.schemas import UserResponse, UserUpdate
+from app.schemas import UserResponse, UserPage, UserUpdate, CountResponse
 from app.auth import get_current_admin_user, get_current_user
+from app.pagination import keyset_page
 
 router = APIRouter(prefix="/students", tags=["Students"])
 
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=UserPage)
 def list_students(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=100),
     is_active: bool = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """
-    List all students (Admin only)
+    List all students (Admin only), oldest first
     
     Query parameters:
-    - skip: Number of records to skip (pagination)
+    - cursor: next_cursor from the previous page (omit for the first page)
     - limit: Maximum number of records to return
     - is_active: Filter by active status (optional)
     """
@@ -37,9 +39,29 @@ def list_students(
     if is_active is not None:
         query = query.filter(User.is_active == is_active)
     
-    students = query.offset(skip).limit(limit).all()
+    students, next_cursor = keyset_page(query, User, cursor, limit)
     
-    return students
+    return {"items": students, "next_cursor": next_cursor}
+
+
+@router.get("/count", response_model=CountResponse)
+def count_students(
+    is_active: bool = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Number of students (Admin only)
+    
+    Query parameters:
+    - is_active: Filter by active status (optional)
+    """
+    query = db.query(func.count(User.id)).filter(User.role == "student")
+    
+    if is_active is not None:
+        query = query.filter(User.is_active == is_active)
+    
+    return {"count": query.scalar()}
 
 
 @router.get("/{student_id}", response_model=UserResponse)
@@ -0,0 +1,159 @@
+"""
+Decomposition of the assignment problem into independent subproblems
+
+Students and shifts form a bipartite graph through availability rows. Its
+connected components share no variables or constraints (e.g. weekend-only
+students never meet weekday-only students), so each one is solved on its
+own in a process pool and the solutions are merged. Workers share a stop
+event with the optimizer, so cancelling a run also stops the searches that
+are already in progress.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from ortools.sat.python import cp_model
+
+from .model_builder import ModelBuilder
+from .solver_profiles import get_profile
+from .lexicographic import solve_lexicographic
+
+# Parallel subproblem solves per optimizer run
+COMPONENT_WORKERS = int(os.getenv("SCHEDULER_COMPONENT_WORKERS", str(os.cpu_count() or 1)))
+# Below this many availability rows a single model is cheaper than a process pool
+DECOMPOSE_MIN_ROWS = int(os.getenv("SCHEDULER_DECOMPOSE_MIN_ROWS", "2000"))
+# How often a worker's search checks the run's stop event
+STOP_POLL_SECONDS = 0.2
+
+_stop_event = None  # multiprocessing.Event shared with the pool, set by init_worker
+
+
+def init_worker(stop_event):
+    """Process pool initializer: keep the run's stop event for this worker's solves"""
+    global _stop_event
+    _stop_event = stop_event
+
+
+def stop_requested() -> bool:
+    return _stop_event is not None and _stop_event.is_set()
+
+
+@contextmanager
+def stop_on_request(solver: cp_model.CpSolver):
+    """
+    Stop the solver's search once the run's stop event is set.
+    StopSearch() only reaches a search in progress, so it is repeated every
+    poll until the block exits.
+    """
+    if _stop_event is None:
+        yield
+        return
+
+    done = threading.Event()
+
+    def watch():
+        while not done.wait(STOP_POLL_SECONDS):
+            if _stop_event.is_set():
+                solver.StopSearch()
+
+    threading.Thread(target=watch, daemon=True).start()
+    try:
+        yield
+    finally:
+        done.set()
+
+
+def connected_components(rows):
+    """
+    Group (student_id, shift_id, rank) rows by connected component of the
+    student-shift availability graph, largest component first
+    """
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for student_id, shift_id, _ in rows:
+        root_student, root_shift = find(("student", student_id)), find(("shift", shift_id))
+        if root_student != root_shift:
+            parent[root_shift] = root_student
+
+    groups = defaultdict(list)
+    for row in rows:
+        groups[find(("student", row[0]))].append(row)
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+def pack_components(components, bins: int):
+    """
+    Pack components into at most `bins` batches of similar size
+    (largest-first greedy), so many tiny components don't each pay for a task
+    """
+    batches = [[] for _ in range(min(bins, len(components)))]
+    sizes = [0] * len(batches)
+    for component in components:
+        smallest = sizes.index(min(sizes))
+        batches[smallest].extend(component)
+        sizes[smallest] += len(component)
+    return [batch for batch in batches if batch]
+
+
+def solve_subproblem(shift_info: dict, student_limits: dict, rows, profile_name: str,
+                     workers: int, hint_assignments=None, objective_mode: str = "weighted") -> dict:
+    """
+    Build and solve the model for one batch of components.
+    Runs in a worker process, so it takes and returns plain data only.
+    """
+    model = cp_model.CpModel()
+    shift_ids = {shift_id for _, shift_id, _ in rows}
+    builder = ModelBuilder(model, {sid: shift_info[sid] for sid in shift_ids}, student_limits)
+    builder.build(rows, {student_id for student_id, _, _ in rows}, objective_mode=objective_mode)
+    if hint_assignments is not None:
+        builder.add_hints(hint_assignments)
+
+    solver = cp_model.CpSolver()
+    profile = get_profile(profile_name)
+    profile.apply(solver)
+    solver.parameters.num_search_workers = workers
+
+    start = time.perf_counter()
+    if objective_mode == "lexicographic":
+        with stop_on_request(solver):
+            phased = solve_lexicographic(
+                model, builder, solver, profile.max_time_in_seconds, is_cancelled=stop_requested
+            )
+        return {
+            "status": phased["status"],
+            "chosen": phased["chosen"],
+            "objective": phased["objective"] or 0.0,
+            "best_bound": 0.0,
+            "variables": len(builder.assignments),
+            "constraints": len(model.Proto().constraints),
+            "solve_seconds": round(time.perf_counter() - start, 3),
+            "phases": phased["phases"],
+        }
+
+    status = cp_model.UNKNOWN
+    if not stop_requested():
+        with stop_on_request(solver):
+            status = solver.Solve(model)
+    result = {
+        "status": solver.StatusName(status),
+        "chosen": [],
+        "objective": 0.0,
+        "best_bound": 0.0,
+        "variables": len(builder.assignments),
+        "constraints": len(model.Proto().constraints),
+        "solve_seconds": round(time.perf_counter() - start, 3),
+    }
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result["chosen"] = [key for key, var in builder.assignments.items() if solver.Value(var) == 1]
+        result["objective"] = solver.ObjectiveValue()
+        result["best_bound"] = solver.BestObjectiveBound()
+    return result
@@ -0,0 +1,136 @@
+"""
+Pre-solve feasibility diagnostics
+
+Availability is loaded into a dense students x shifts int8 matrix
+(0 = unavailable, 1-5 = preference rank, 6 = available without a rank) and
+checked with vectorized NumPy operations, so obviously bad inputs are
+reported in milliseconds before any solver time is spent.
+"""
+
+import numpy as np
+
+from .model_builder import DEFAULT_MAX_SHIFTS_PER_DAY
+
+UNAVAILABLE = 0
+NEUTRAL_RANK = 6
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+NO_SHIFTS_ERROR = "No active shifts to schedule"
+NO_STUDENTS_ERROR = "No active students have submitted availability for this semester"
+
+
+def availability_matrix(student_ids, shift_ids, rows) -> np.ndarray:
+    """Dense int8 rank matrix from (student_id, shift_id, preference_rank) rows"""
+    student_index = {student_id: i for i, student_id in enumerate(student_ids)}
+    shift_index = {shift_id: j for j, shift_id in enumerate(shift_ids)}
+
+    matrix = np.zeros((len(student_ids), len(shift_ids)), dtype=np.int8)
+    cells = [
+        (student_index[student_id], shift_index[shift_id], rank or NEUTRAL_RANK)
+        for student_id, shift_id, rank in rows
+        if student_id in student_index and shift_id in shift_index
+    ]
+    if cells:
+        i, j, ranks = zip(*cells)
+        matrix[list(i), list(j)] = ranks
+    return matrix
+
+
+def diagnose(matrix: np.ndarray, shifts, student_ids, preferences) -> dict:
+    """
+    Vectorized checks over the availability matrix.
+
+    shifts:      list of Shift rows in matrix column order
+    student_ids: ids in matrix row order
+    preferences: student_id -> StudentPreference for the semester
+    """
+    available = matrix > UNAVAILABLE
+    errors, warnings = [], []
+
+    required = np.array([shift.required_students for shift in shifts], dtype=np.int32)
+    durations = np.array([shift.duration_hours for shift in shifts], dtype=np.float64)
+    days = np.array([shift.day_of_week for shift in shifts], dtype=np.int64)
+
+    if not shifts:
+        errors.append(NO_SHIFTS_ERROR)
+    if not student_ids:
+        errors.append(NO_STUDENTS_ERROR)
+
+    # Candidates per shift against required_students
+    candidates = available.sum(axis=0, dtype=np.int32)
+    short = np.flatnonzero(candidates < required)
+    understaffed_shifts = [
+        {
+            "shift_id": shifts[j].id,
+            "day_name": shifts[j].day_name,
+            "start_time": str(shifts[j].start_time),
+            "end_time": str(shifts[j].end_time),
+            "candidates": int(candidates[j]),
+            "required_students": int(required[j]),
+            "shortfall": int(required[j] - candidates[j]),
+        }
+        for j in short
+    ]
+    uncovered = int((candidates == 0).sum())
+    if shifts and student_ids and uncovered == len(shifts):
+        errors.append("No shift has any available student")
+    elif uncovered:
+        warnings.append(f"{uncovered} shift(s) have no available students")
+    if len(short) > uncovered:
+        warnings.append(f"{len(short) - uncovered} shift(s) have fewer candidates than required")
+
+    # Hall-style capacity per day: demand vs. what students can supply under their daily cap
+    max_per_day = np.array([
+        getattr(preferences.get(student_id), "max_shifts_per_day", None) or DEFAULT_MAX_SHIFTS_PER_DAY
+        for student_id in student_ids
+    ], dtype=np.int32)
+    day_onehot = np.zeros((len(shifts), 7), dtype=np.int32)
+    day_onehot[np.arange(len(shifts)), days] = 1
+    per_student_day = available.astype(np.int32) @ day_onehot  # students x 7
+    supply = np.minimum(per_student_day, max_per_day[:, None]).sum(axis=0)
+    demand = required @ day_onehot
+    day_capacity = [
+        {
+            "day_of_week": d,
+            "day_name": DAY_NAMES[d],
+            "demand": int(demand[d]),
+            "supply": int(supply[d]),
+            "shortfall": int(max(0, demand[d] - supply[d])),
+        }
+        for d in range(7) if demand[d] > 0
+    ]
+    short_days = [day["day_name"] for day in day_capacity if day["shortfall"] > 0]
+    if short_days:
+        warnings.append(f"Not enough student capacity to fully staff: {', '.join(short_days)}")
+
+    # Students whose desired hours exceed everything they are available for
+    desired = np.array([
+        getattr(preferences.get(student_id), "desired_hours_per_week", None) or 0
+        for student_id in student_ids
+    ], dtype=np.float64)
+    available_hours = available.astype(np.float64) @ durations
+    unmet = np.flatnonzero(available_hours < desired)
+    unmet_desired_hours = [
+        {
+            "user_id": student_ids[i],
+            "desired_hours_per_week": float(desired[i]),
+            "available_hours": float(available_hours[i]),
+        }
+        for i in unmet
+    ]
+    if len(unmet):
+        warnings.append(f"{len(unmet)} student(s) can never reach their desired hours")
+
+    return {
+        "feasible": not errors,
+        "errors": errors,
+        "warnings": warnings,
+        "total_students": len(student_ids),
+        "total_shifts": len(shifts),
+        "available_pairs": int(available.sum()),
+        "required_slots": int(required.sum()),
+        "understaffed_shifts": understaffed_shifts,
+        "day_capacity": day_capacity,
+        "unmet_desired_hours": unmet_desired_hours,
+    }
@@ -0,0 +1,143 @@
+"""
+Min-cost-flow engine for the pure assignment problem
+
+With only per-shift capacity and per-student caps the schedule is a
+transportation problem:
+
+    source -> student -> student's day -> shift -> sink
+
+Student->day arcs carry the per-day cap. Each day->shift arc carries the
+negated fill and preference weight.
+Source->student capacity is split into unit arcs: the k-th costs the fairness
+weight k times, which is the CP-SAT model's fairness term. A zero-cost
+source->sink bypass lets slots stay unfilled. Solves in milliseconds for
+thousands of students.
+
+Hours caps and overlaps are not expressible in a flow. Each student's shift
+cap is tightened to what fits under their hours limit at their longest
+candidate shift. A day with overlapping candidate shifts is capped at one
+shift. The result is always feasible for the CP-SAT model, and optimal for it
+when those two tightenings change nothing: every student's candidate shifts
+have the same length, and none overlap on a day where the student may work
+more than one shift.
+"""
+
+import time
+import numpy as np
+from ortools.graph.python import min_cost_flow
+
+from .model_builder import (
+    DEFAULT_WEIGHTS, DEFAULT_MAX_SHIFTS_PER_DAY, EXTRA_SHIFTS_ALLOWED, HOURS_OVERRUN_FACTOR, preference_weight
+)
+
+
+def student_capacity(limits, durations, fixed_load=(0, 0, {})) -> int:
+    """Shifts a student can take without exceeding the model's shift or hours caps"""
+    if not limits:
+        return len(durations)
+    max_shifts_per_week, desired_hours, _ = limits
+    fixed_shifts, fixed_hours, _ = fixed_load
+    shift_limit = max_shifts_per_week + EXTRA_SHIFTS_ALLOWED - fixed_shifts
+    hours_limit = int(desired_hours * 100 * HOURS_OVERRUN_FACTOR) - fixed_hours
+    longest = max(durations, default=0)
+    if longest:
+        shift_limit = min(shift_limit, hours_limit // longest)
+    return max(0, min(shift_limit, len(durations)))
+
+
+def day_capacity(limits, windows, fixed_shifts: int = 0) -> int:
+    """
+    Shifts a student can take on one day: the per-day cap, or one shift if
+    any of the day's (start, end) candidate windows overlap
+    """
+    max_per_day = (limits[2] if limits else None) or DEFAULT_MAX_SHIFTS_PER_DAY
+    capacity = min(max(0, max_per_day - fixed_shifts), len(windows))
+    windows = sorted(windows)
+    if capacity > 1 and any(start < end for (_, end), (start, _) in zip(windows, windows[1:])):
+        return 1
+    return capacity
+
+
+def solve_min_cost_flow(shift_info: dict, student_limits: dict, rows, weights: dict = None,
+                        fixed_load: dict = None) -> dict:
+    """
+    Solve the assignment as a min-cost flow.
+    rows are (student_id, shift_id, preference_rank) tuples; the other
+    arguments are as for ModelBuilder.
+    Returns {"status", "chosen", "objective", "arcs", "seconds"}.
+    """
+    start = time.perf_counter()
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    fixed_load = fixed_load or {}
+
+    candidates = {}  # student_id -> [(shift_id, rank)]
+    seen = set()
+    for student_id, shift_id, rank in rows:
+        if shift_id in shift_info and (student_id, shift_id) not in seen:
+            seen.add((student_id, shift_id))
+            candidates.setdefault(student_id, []).append((shift_id, rank))
+
+    # Nodes: 0 = source, 1 = sink, then students, then shifts, then student days
+    student_nodes = {student_id: 2 + i for i, student_id in enumerate(candidates)}
+    shift_nodes = {shift_id: 2 + len(student_nodes) + j for j, shift_id in enumerate(shift_info)}
+    next_node = 2 + len(student_nodes) + len(shift_nodes)
+    total_required = sum(required for required, *_ in shift_info.values())
+
+    tails, heads, capacities, costs = [], [], [], []
+
+    def arc(tail, head, capacity, cost):
+        tails.append(tail)
+        heads.append(head)
+        capacities.append(capacity)
+        costs.append(cost)
+
+    assignment_arcs = []  # (arc index, student_id, shift_id)
+    for student_id, options in candidates.items():
+        limits = student_limits.get(student_id)
+        fixed = fixed_load.get(student_id, (0, 0, {}))
+        capacity = student_capacity(limits, [shift_info[shift_id][1] for shift_id, _ in options], fixed)
+        # k-th additional shift costs the fairness penalty k times (convex, so taken in order)
+        for k in range(fixed[0], fixed[0] + capacity):
+            arc(0, student_nodes[student_id], 1, -weights["fairness"] * k)
+
+        by_day = {}
+        for shift_id, rank in options:
+            by_day.setdefault(shift_info[shift_id][2], []).append((shift_id, rank))
+        for day, day_options in by_day.items():
+            windows = [shift_info[shift_id][3:5] for shift_id, _ in day_options]
+            day_node = next_node
+            next_node += 1
+            arc(student_nodes[student_id], day_node, day_capacity(limits, windows, fixed[2].get(day, 0)), 0)
+            for shift_id, rank in day_options:
+                assignment_arcs.append((len(tails), student_id, shift_id))
+                arc(day_node, shift_nodes[shift_id], 1, -(weights["fill"] + preference_weight(rank, weights)))
+
+    for shift_id, (required, *_) in shift_info.items():
+        arc(shift_nodes[shift_id], 1, required, 0)
+    arc(0, 1, total_required, 0)  # Unfilled slots
+
+    flow = min_cost_flow.SimpleMinCostFlow()
+    flow.add_arcs_with_capacity_and_unit_cost(
+        np.array(tails, dtype=np.int32), np.array(heads, dtype=np.int32),
+        np.array(capacities, dtype=np.int64), np.array(costs, dtype=np.int64)
+    )
+    flow.set_node_supply(0, total_required)
+    flow.set_node_supply(1, -total_required)
+    status = flow.solve()
+
+    result = {
+        "status": status.name,
+        "chosen": [],
+        "objective": None,
+        "arcs": flow.num_arcs(),
+        "seconds": 0.0,
+    }
+    if status == flow.OPTIMAL:
+        flows = flow.flows(np.array([a for a, _, _ in assignment_arcs], dtype=np.int64))
+        result["chosen"] = [
+            (student_id, shift_id)
+            for (_, student_id, shift_id), units in zip(assignment_arcs, flows) if units
+        ]
+        result["objective"] = float(-flow.optimal_cost())
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
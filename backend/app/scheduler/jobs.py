@@ -0,0 +1,543 @@
+"""
+Background solver jobs: schedule generation, repair and what-if scenarios
+
+Each solve runs in a fresh child process with its own memory and CPU-time
+ceilings, supervised by a bounded pool of threads in the API process. The
+supervisor samples the resident memory of the solver process and its pools
+and kills the tree when it passes the ceiling; the job itself stops once the
+tree has used up its CPU time. A runaway semester can only take down its own
+solver processes, and the job still gets a terminal status with an error code.
+
+Job state lives in the schedule_jobs table, which lets any API worker report
+status and accept cancellation for any job. Queued jobs wait in the memory
+of the API process that accepted them, so each process keeps a heartbeat on
+the jobs it holds; active jobs whose heartbeat lapses are failed as
+abandoned, and are never attached to.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; solves then run without ceilings
+    resource = None
+
+from .. import models, database
+from . import optimizer, scenarios
+from .process_stats import process_tree, memory_mb, cpu_seconds
+
+# Maximum number of solves running at once (per API process)
+MAX_WORKERS = int(os.getenv("SCHEDULER_MAX_WORKERS", "2"))
+# How often a running job checks whether it has been cancelled
+CANCEL_POLL_SECONDS = float(os.getenv("SCHEDULER_CANCEL_POLL_SECONDS", "1.0"))
+
+# Resident-memory ceiling per job in MB, summed over the solver process and
+# its pools (0 = unlimited)
+MEMORY_LIMIT_MB = int(os.getenv("SCHEDULER_MEMORY_LIMIT_MB", "4096"))
+# How often the supervisor samples a job's resident memory
+MEMORY_POLL_SECONDS = float(os.getenv("SCHEDULER_MEMORY_POLL_SECONDS", "0.5"))
+# Address-space backstop per process, as a multiple of MEMORY_LIMIT_MB (0 = none).
+# Virtual memory runs well above resident memory (thread stacks, allocator
+# arenas, BLAS buffers), so this only catches growth between samples.
+ADDRESS_SPACE_FACTOR = float(os.getenv("SCHEDULER_ADDRESS_SPACE_FACTOR", "4"))
+# An abnormal exit after reaching this fraction of a memory limit counts as running out of memory
+MEMORY_NEAR_LIMIT = 0.9
+# CPU-time ceiling per job, summed over its processes and search threads (0 = unlimited)
+CPU_LIMIT_SECONDS = int(os.getenv("SCHEDULER_CPU_LIMIT_SECONDS", "3600"))
+# Niceness added to solver processes so API requests win the CPU
+SOLVER_NICE = int(os.getenv("SCHEDULER_SOLVER_NICE", "10"))
+# CPU time past the ceiling before the kernel kills a solve that did not stop
+CPU_LIMIT_GRACE_SECONDS = 60
+# Exit status of a solver process that ran out of memory outside the job's own handling
+EXIT_MEMORY_LIMIT = 3
+# How often an API process refreshes the heartbeat of its queued and running jobs
+HEARTBEAT_SECONDS = float(os.getenv("SCHEDULER_HEARTBEAT_SECONDS", "30"))
+# Active jobs without a heartbeat for this long lost their API process (restart, SIGKILL, OOM)
+JOB_LEASE_SECONDS = float(os.getenv("SCHEDULER_JOB_LEASE_SECONDS", "120"))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# ScheduleJob.kind values
+KIND_GENERATE = "generate"
+KIND_REPAIR = "repair"
+KIND_SCENARIOS = "scenarios"
+
+# ScheduleJob.error_code values
+ERROR_REJECTED = "rejected"
+ERROR_INFEASIBLE = "infeasible"
+ERROR_MEMORY_LIMIT = "memory_limit"
+ERROR_CPU_LIMIT = "cpu_limit"
+ERROR_SOLVER_CRASHED = "solver_crashed"
+ERROR_EXCEPTION = "exception"
+ERROR_ABANDONED = "abandoned"
+
+_executor = None
+_heartbeat = None
+_held_jobs = set()  # Ids of the jobs queued or running in this process
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Lazily create the shared pool of solver supervisors, and its heartbeat"""
+    global _executor, _heartbeat
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="solver-supervisor")
+            _heartbeat = Heartbeat()
+            _heartbeat.start()
+        return _executor
+
+
+def shutdown():
+    """Stop accepting jobs and cancel anything still queued in this process"""
+    global _executor, _heartbeat
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _heartbeat.stop()
+            _executor = _heartbeat = None
+
+
+class Heartbeat(threading.Thread):
+    """Refreshes heartbeat_at of the jobs held by this process"""
+
+    def __init__(self):
+        super().__init__(daemon=True, name="solver-heartbeat")
+        self.finished = threading.Event()
+
+    def run(self):
+        while not self.finished.wait(HEARTBEAT_SECONDS):
+            with _executor_lock:
+                job_ids = list(_held_jobs)
+            if not job_ids:
+                continue
+            db = database.SessionLocal()
+            try:
+                db.query(models.ScheduleJob).filter(
+                    models.ScheduleJob.id.in_(job_ids),
+                    models.ScheduleJob.status.in_(ACTIVE_STATUSES)
+                ).update({models.ScheduleJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                # A missed beat is harmless unless the database stays away for a whole lease
+                print(f"Warning: could not record job heartbeat: {e}")
+            finally:
+                db.close()
+
+    def stop(self):
+        self.finished.set()
+
+
+def abandoned_jobs(db: Session):
+    """Query for active jobs whose heartbeat lapsed"""
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)
+    return db.query(models.ScheduleJob).filter(
+        models.ScheduleJob.status.in_(ACTIVE_STATUSES),
+        func.coalesce(models.ScheduleJob.heartbeat_at, models.ScheduleJob.created_at) < cutoff
+    )
+
+
+def is_abandoned(job: models.ScheduleJob) -> bool:
+    last_seen = job.heartbeat_at or job.created_at
+    return (
+        job.status in ACTIVE_STATUSES and last_seen is not None
+        and last_seen.replace(tzinfo=None) < datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)
+    )
+
+
+def expire_abandoned_jobs(db: Session) -> int:
+    """
+    Fail active jobs whose heartbeat lapsed, in the caller's transaction.
+    Returns the number of jobs failed.
+    """
+    return abandoned_jobs(db).update({
+        models.ScheduleJob.status: "failed",
+        models.ScheduleJob.error_code: ERROR_ABANDONED,
+        models.ScheduleJob.error: f"Job was abandoned: no heartbeat from its API process for {JOB_LEASE_SECONDS:.0f} s",
+        models.ScheduleJob.finished_at: datetime.utcnow(),
+    }, synchronize_session=False)
+
+
+def recover_abandoned_jobs():
+    """Startup hook: fail the jobs a previous run of the API left queued or running"""
+    db = database.SessionLocal()
+    try:
+        expired = expire_abandoned_jobs(db)
+        db.commit()
+    finally:
+        db.close()
+    if expired:
+        print(f"Marked {expired} abandoned solver job(s) as failed")
+    return expired
+
+
+def update_job(job_id: str, **fields):
+    """Write job fields in a short-lived session of its own"""
+    db = database.SessionLocal()
+    try:
+        db.query(models.ScheduleJob).filter(models.ScheduleJob.id == job_id).update(fields)
+        db.commit()
+    finally:
+        db.close()
+
+
+def semester_lock_key(semester: str) -> int:
+    """Signed 64-bit advisory lock key for generation jobs of a semester"""
+    digest = hashlib.sha256(f"schedule-generation:{semester}".encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def find_or_create_generation_job(db: Session, semester: str, options: dict, requested_by: str,
+                                  kind: str = KIND_GENERATE):
+    """
+    Single-flight job creation: a request with the same kind, semester and
+    options as an active job attaches to it instead of starting another solve.
+    Abandoned jobs are failed first, so requests never attach to them.
+    Returns (job, created); only created jobs need to be submitted.
+
+    On PostgreSQL a transaction-scoped advisory lock per semester makes the
+    check and insert atomic across API workers. SQLite serializes writers,
+    which covers the single-process development setup.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": semester_lock_key(semester)})
+
+    expire_abandoned_jobs(db)
+    active = db.query(models.ScheduleJob).filter(
+        models.ScheduleJob.kind == kind,
+        models.ScheduleJob.semester == semester,
+        models.ScheduleJob.status.in_(ACTIVE_STATUSES),
+        models.ScheduleJob.cancel_requested == False
+    ).order_by(models.ScheduleJob.created_at).all()
+    for job in active:
+        if (job.options or {}) == options:
+            db.commit()  # Releases the advisory lock
+            print(f"Attaching {kind} request for {semester} to active job {job.id}")
+            return job, False
+
+    job = models.ScheduleJob(
+        kind=kind,
+        semester=semester,
+        status="queued",
+        progress=0,
+        options=options,
+        requested_by=requested_by,
+        heartbeat_at=datetime.utcnow()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job, True
+
+
+def submit_generation_job(job: models.ScheduleJob):
+    """Queue a persisted job for a solver supervisor"""
+    executor = get_executor()
+    with _executor_lock:
+        _held_jobs.add(job.id)
+    future = executor.submit(
+        supervise_generation_job, job.id, job.semester, job.requested_by, job.options or {}
+    )
+    future.add_done_callback(partial(_on_job_done, job.id))
+    return future
+
+
+def _on_job_done(job_id: str, future):
+    """Mark the job failed if its supervisor died before an outcome was recorded"""
+    with _executor_lock:
+        _held_jobs.discard(job_id)
+    if future.cancelled():
+        update_job(job_id, status="cancelled", finished_at=datetime.utcnow())
+        return
+
+    error = future.exception()
+    if error is not None:
+        fail_if_active(job_id, ERROR_EXCEPTION, f"Solver supervisor failed: {error}")
+
+
+def fail_if_active(job_id: str, error_code: str, error: str):
+    """Record a failure unless the job already reached a terminal status"""
+    db = database.SessionLocal()
+    try:
+        job = db.query(models.ScheduleJob).filter(models.ScheduleJob.id == job_id).first()
+        if job and job.status in ACTIVE_STATUSES:
+            job.status = "failed"
+            job.error_code = error_code
+            job.error = error
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+
+
+def supervise_generation_job(job_id: str, semester: str, user_id: str, options: dict):
+    """
+    Supervisor thread entry point: run one job in its own solver process and
+    record a failure if the process died without recording an outcome
+    """
+    process = multiprocessing.get_context("spawn").Process(
+        target=run_isolated_generation_job, args=(job_id, semester, user_id, options),
+        name=f"solver-{job_id}"
+    )
+    process.start()
+
+    peak_resident = peak_virtual = 0.0
+    while True:
+        process.join(MEMORY_POLL_SECONDS)
+        if process.exitcode is not None:
+            break
+        tree = process_tree(process.pid)
+        resident, virtual = memory_mb(tree)
+        peak_resident, peak_virtual = max(peak_resident, resident), max(peak_virtual, virtual)
+        if MEMORY_LIMIT_MB and resident > MEMORY_LIMIT_MB:
+            kill_tree(tree)
+            process.join()
+            error = f"Solver used {resident:.0f} MB, over its {MEMORY_LIMIT_MB} MB memory limit"
+            print(f"Killed solver process for job {job_id}: {error}")
+            fail_if_active(job_id, ERROR_MEMORY_LIMIT, error)
+            return
+
+    if process.exitcode == 0:
+        return
+
+    error_code, error = describe_exit(process.exitcode, peak_resident, peak_virtual)
+    print(f"Solver process for job {job_id} exited with code {process.exitcode}: {error}")
+    fail_if_active(job_id, error_code, error)
+
+
+def kill_tree(pids):
+    """SIGKILL a solver process and its pools, children first"""
+    for pid in reversed(pids):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass  # Already gone
+
+
+def address_space_limit_mb() -> float:
+    return MEMORY_LIMIT_MB * ADDRESS_SPACE_FACTOR if MEMORY_LIMIT_MB and ADDRESS_SPACE_FACTOR else 0
+
+
+def describe_exit(exitcode: int, peak_resident: float = 0.0, peak_virtual: float = 0.0):
+    """
+    (error_code, message) for a solver process that exited abnormally.
+    peak_resident and peak_virtual are the supervisor's samples in MB: native
+    allocation failures near a memory limit may exit with any status (e.g.
+    OpenBLAS exits with 1), so those count as running out of memory.
+    """
+    if exitcode == EXIT_MEMORY_LIMIT:
+        return ERROR_MEMORY_LIMIT, f"Solver ran out of memory (limit {MEMORY_LIMIT_MB} MB)"
+    if exitcode == -getattr(signal, "SIGXCPU", 0):
+        return ERROR_CPU_LIMIT, f"Solver exceeded its CPU-time limit of {CPU_LIMIT_SECONDS} s"
+
+    if exitcode >= 0:
+        message = f"Solver process exited with status {exitcode}"
+    else:
+        try:
+            message = f"Solver process was killed by {signal.Signals(-exitcode).name}"
+        except ValueError:
+            message = f"Solver process was killed by signal {-exitcode}"
+
+    if MEMORY_LIMIT_MB and peak_resident >= MEMORY_LIMIT_MB * MEMORY_NEAR_LIMIT:
+        return ERROR_MEMORY_LIMIT, (
+            f"{message} after using {peak_resident:.0f} MB of its {MEMORY_LIMIT_MB} MB memory limit"
+        )
+    address_space = address_space_limit_mb()
+    if address_space and peak_virtual >= address_space * MEMORY_NEAR_LIMIT:
+        return ERROR_MEMORY_LIMIT, (
+            f"{message} after reserving {peak_virtual:.0f} MB of its {address_space:.0f} MB address space"
+        )
+    if exitcode >= 0:
+        return ERROR_SOLVER_CRASHED, message
+    if address_space and exitcode in (-signal.SIGKILL, -signal.SIGABRT, -signal.SIGSEGV):
+        # Native allocation failures under the address-space backstop often end this way
+        return ERROR_MEMORY_LIMIT, f"{message}, most likely after reaching its memory limit"
+    return ERROR_SOLVER_CRASHED, message
+
+
+def _set_limit(kind: int, soft: int, hard: int):
+    """setrlimit that never asks for more than the inherited hard limit"""
+    _, current_hard = resource.getrlimit(kind)
+    if current_hard != resource.RLIM_INFINITY:
+        soft, hard = min(soft, current_hard), min(hard, current_hard)
+    resource.setrlimit(kind, (soft, hard))
+
+
+def apply_resource_limits():
+    """
+    Lower the current process's priority and set per-process kernel
+    backstops for memory and CPU time. Processes it starts (component and
+    scenario pools) inherit them. The job-wide limits are enforced by the
+    supervisor (memory) and CancelWatcher (CPU time).
+    """
+    if hasattr(os, "nice") and SOLVER_NICE:
+        os.nice(SOLVER_NICE)
+    if resource is None:
+        return
+    if address_space_limit_mb():
+        limit = int(address_space_limit_mb() * 1024 * 1024)
+        _set_limit(resource.RLIMIT_AS, limit, limit)
+    if CPU_LIMIT_SECONDS:
+        # SIGXCPU from the kernel is the backstop for a solve that does not stop
+        soft = CPU_LIMIT_SECONDS + CPU_LIMIT_GRACE_SECONDS
+        _set_limit(resource.RLIMIT_CPU, soft, soft + CPU_LIMIT_GRACE_SECONDS)
+
+
+def run_isolated_generation_job(job_id: str, semester: str, user_id: str, options: dict):
+    """Solver process entry point"""
+    apply_resource_limits()
+    try:
+        run_generation_job(job_id, semester, user_id, options)
+    except MemoryError:
+        # Too little memory left even to record the failure; the supervisor does
+        os._exit(EXIT_MEMORY_LIMIT)
+
+
+def job_cpu_seconds() -> float:
+    """
+    CPU time of this process, its live descendants (component and scenario
+    pools) and its children that already exited
+    """
+    total = time.process_time()
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        total += usage.ru_utime + usage.ru_stime
+    return total + sum(cpu_seconds(pid) for pid in process_tree(os.getpid())[1:])
+
+
+class CancelWatcher(threading.Thread):
+    """
+    Polls the job row and stops the job's runner (ScheduleOptimizer or
+    ScenarioRunner) once cancellation is requested, or once the job's
+    processes have used up its CPU-time limit
+    """
+
+    def __init__(self, job_id: str, runner):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.runner = runner
+        self.finished = threading.Event()
+        self.cpu_limit_exceeded = False
+
+    def run(self):
+        while not self.finished.wait(CANCEL_POLL_SECONDS):
+            if CPU_LIMIT_SECONDS and job_cpu_seconds() >= CPU_LIMIT_SECONDS:
+                self.cpu_limit_exceeded = True
+                self.runner.cancel()
+                return
+            db = database.SessionLocal()
+            try:
+                requested = db.query(models.ScheduleJob.cancel_requested).filter(
+                    models.ScheduleJob.id == self.job_id
+                ).scalar()
+            finally:
+                db.close()
+            if requested:
+                self.runner.cancel()
+
+    def stop(self):
+        self.finished.set()
+
+
+def run_generation_job(job_id: str, semester: str, user_id: str, options: dict):
+    """
+    Run one job (generation, repair or scenarios) to completion in the current process.
+    Always records a terminal status on the job row. Returns the id of the
+    schedule it saved, if any.
+    """
+    db = database.SessionLocal()
+    try:
+        job = db.query(models.ScheduleJob).filter(models.ScheduleJob.id == job_id).first()
+        if job is None or job.status != "queued":
+            # Deleted or cancelled while waiting for a worker
+            return None
+        if job.cancel_requested:
+            job.status = "cancelled"
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            return None
+
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        progress = lambda stage, percent: update_job(job_id, stage=stage, progress=percent)
+        if job.kind == KIND_SCENARIOS:
+            runner = scenarios.ScenarioRunner(db, semester, user_id, progress=progress, **options)
+            run = runner.run
+        elif job.kind == KIND_REPAIR:
+            options = dict(options)
+            changes = (options.pop("base_schedule_id"), options.pop("shift_ids", []), options.pop("student_ids", []))
+            runner = optimizer.ScheduleOptimizer(db, semester, user_id, progress=progress, **options)
+            run = partial(runner.repair, *changes)
+        else:
+            runner = optimizer.ScheduleOptimizer(db, semester, user_id, progress=progress, **options)
+            run = runner.generate
+        watcher = CancelWatcher(job_id, runner)
+        watcher.start()
+        try:
+            outcome = run()
+        finally:
+            watcher.stop()
+
+        # A schedule saved before a stop arrived is already committed; keep it
+        saved = outcome["schedule"] if job.kind == KIND_SCENARIOS and outcome else outcome
+        if saved is None and watcher.cpu_limit_exceeded:
+            update_job(
+                job_id, status="failed", finished_at=datetime.utcnow(), error_code=ERROR_CPU_LIMIT,
+                error=f"Solver exceeded its CPU-time limit of {CPU_LIMIT_SECONDS} s"
+            )
+            return None
+        if saved is None and runner.cancelled:
+            update_job(job_id, status="cancelled", finished_at=datetime.utcnow())
+            return None
+        if job.kind == KIND_SCENARIOS:
+            schedule = outcome["schedule"]
+            update_job(
+                job_id, status="completed", stage="done", progress=100, result={"results": outcome["results"]},
+                schedule_id=schedule.id if schedule else None, finished_at=datetime.utcnow()
+            )
+            return schedule.id if schedule else None
+
+        schedule = outcome
+        if schedule is None:
+            report = runner.diagnostics
+            if report and report["errors"]:
+                error_code = ERROR_REJECTED
+                error = "Rejected before solving: " + "; ".join(report["errors"])
+            else:
+                error_code = ERROR_INFEASIBLE
+                action = "repair the schedule" if job.kind == KIND_REPAIR else "generate a valid schedule"
+                error = f"Could not {action} (infeasible constraints)"
+            update_job(job_id, status="failed", finished_at=datetime.utcnow(), error_code=error_code, error=error)
+            return None
+
+        update_job(
+            job_id, status="completed", stage="done", progress=100,
+            schedule_id=schedule.id, finished_at=datetime.utcnow()
+        )
+        return schedule.id
+
+    except MemoryError:
+        db.rollback()
+        update_job(
+            job_id, status="failed", finished_at=datetime.utcnow(), error_code=ERROR_MEMORY_LIMIT,
+            error=f"Solver ran out of memory (limit {MEMORY_LIMIT_MB} MB)"
+        )
+        return None
+    except Exception as e:
+        db.rollback()
+        update_job(job_id, status="failed", error_code=ERROR_EXCEPTION, error=str(e), finished_at=datetime.utcnow())
+        return None
+    finally:
+        db.close()
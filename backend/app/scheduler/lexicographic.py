@@ -0,0 +1,84 @@
+"""
+Lexicographic multi-phase objective
+
+Instead of one hand-tuned weighted sum, the model is solved in phases:
+  1. maximize coverage (filled slots)
+  2. fix coverage, maximize preference points
+  3. fix preference, minimize the maximum student load (hours)
+Each phase is warm-started from the previous phase's solution and gets an
+equal share of the remaining time budget, so total latency stays fixed.
+"""
+
+import time
+from ortools.sat.python import cp_model
+
+from .model_builder import ModelBuilder, preference_weight
+
+SOLVED = (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+
+def _hint_solution(model: cp_model.CpModel, values: dict, assignments: dict):
+    model.ClearHints()
+    for key, var in assignments.items():
+        model.AddHint(var, values[key])
+
+
+def solve_lexicographic(model: cp_model.CpModel, builder: ModelBuilder, solver: cp_model.CpSolver,
+                        time_budget: float, is_cancelled=lambda: False) -> dict:
+    """
+    Run the three phases on a built model (without objective).
+    Returns {"status", "chosen", "objective", "phases"}; "chosen" holds the
+    last phase that produced a solution, empty if none did.
+    """
+    phases = [
+        ("coverage", builder.coverage_expr(), True),
+        ("preference", builder.preference_expr(), True),
+        ("max_load", builder.max_load_var(), False),
+    ]
+    deadline = time.perf_counter() + time_budget
+    values = None
+    status = cp_model.UNKNOWN
+    results = []
+
+    for i, (name, expr, maximize) in enumerate(phases):
+        if is_cancelled():
+            break
+        if maximize:
+            model.Maximize(expr)
+        else:
+            model.Minimize(expr)
+
+        remaining = max(0.0, deadline - time.perf_counter())
+        solver.parameters.max_time_in_seconds = max(0.1, remaining / (len(phases) - i))
+        start = time.perf_counter()
+        phase_status = solver.Solve(model)
+        results.append({
+            "phase": name,
+            "status": solver.StatusName(phase_status),
+            "value": solver.ObjectiveValue() if phase_status in SOLVED else None,
+            "seconds": round(time.perf_counter() - start, 3),
+        })
+        if phase_status not in SOLVED:
+            # Keep the previous phase's solution
+            break
+
+        status = phase_status
+        values = {key: solver.Value(var) for key, var in builder.assignments.items()}
+        best = int(round(solver.ObjectiveValue()))
+        # Fix this phase's optimum (or best found) for the next phases
+        model.Add(expr >= best if maximize else expr <= best)
+        _hint_solution(model, values, builder.assignments)
+
+    if values is None:
+        return {"status": solver.StatusName(status), "chosen": [], "objective": None, "phases": results}
+
+    chosen = [key for key, value in values.items() if value == 1]
+    preference = sum(preference_weight(builder.ranks[key], builder.weights) for key in chosen)
+    return {
+        "status": solver.StatusName(status),
+        "chosen": chosen,
+        # Comparable to the weighted mode's score (without its fairness term)
+        "objective": float(builder.weights["fill"] * len(chosen) + preference),
+        "phases": results,
+    }
+
@@ -0,0 +1,122 @@
+"""
+Columnar semester loader
+
+The optimizer only reads a few columns of shifts, preferences and
+availability. Selecting them as plain rows skips ORM hydration and the
+session identity map. Shifts and preferences become small __slots__ records
+with the attributes the scheduler reads. Availability stays as
+(user_id, shift_id, preference_rank) rows, the bulk of the data. One load is
+three queries.
+"""
+
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from .diagnostics import DAY_NAMES
+
+
+class ShiftRecord:
+    """Active shift columns used by the scheduler"""
+    __slots__ = ("id", "day_of_week", "start_time", "end_time", "shift_type", "required_students")
+
+    COLUMNS = (
+        models.Shift.id, models.Shift.day_of_week, models.Shift.start_time, models.Shift.end_time,
+        models.Shift.shift_type, models.Shift.required_students,
+    )
+
+    def __init__(self, id, day_of_week, start_time, end_time, shift_type, required_students):
+        self.id = id
+        self.day_of_week = day_of_week
+        self.start_time = start_time
+        self.end_time = end_time
+        self.shift_type = shift_type
+        self.required_students = required_students
+
+    @property
+    def day_name(self):
+        return DAY_NAMES[self.day_of_week]
+
+    @property
+    def duration_hours(self):
+        dt = datetime.combine(datetime.min, self.end_time) - datetime.combine(datetime.min, self.start_time)
+        return dt.total_seconds() / 3600
+
+
+class PreferenceRecord:
+    """Semester preference columns used by the scheduler"""
+    __slots__ = (
+        "user_id", "desired_hours_per_week", "max_shifts_per_day", "max_shifts_per_week",
+        "can_work_weekends", "can_work_rotating",
+    )
+
+    COLUMNS = (
+        models.StudentPreference.user_id, models.StudentPreference.desired_hours_per_week,
+        models.StudentPreference.max_shifts_per_day, models.StudentPreference.max_shifts_per_week,
+        models.StudentPreference.can_work_weekends, models.StudentPreference.can_work_rotating,
+    )
+
+    def __init__(self, user_id, desired_hours_per_week, max_shifts_per_day, max_shifts_per_week,
+                 can_work_weekends, can_work_rotating):
+        self.user_id = user_id
+        self.desired_hours_per_week = desired_hours_per_week
+        self.max_shifts_per_day = max_shifts_per_day
+        self.max_shifts_per_week = max_shifts_per_week
+        self.can_work_weekends = can_work_weekends
+        self.can_work_rotating = can_work_rotating
+
+
+def available_rows(statement, semester: str):
+    """Restrict a select to the semester's available rows of active students"""
+    # Only explicit is_available=True records make a student a candidate (opt-in)
+    return statement.join(models.User, models.User.id == models.Availability.user_id).where(
+        models.Availability.semester == semester,
+        models.Availability.is_available == True,
+        models.User.role == "student",
+        models.User.is_active == True,
+    )
+
+
+def count_semester(db: Session, semester: str):
+    """(active shifts, available rows of active students) as two COUNT queries"""
+    connection = db.connection()
+    shifts = connection.execute(
+        select(func.count()).select_from(models.Shift).where(models.Shift.is_active == True)
+    ).scalar()
+    rows = connection.execute(
+        available_rows(select(func.count()).select_from(models.Availability), semester)
+    ).scalar()
+    return shifts, rows
+
+
+def load_semester(db: Session, semester: str):
+    """
+    Active shifts, candidate student ids, semester preferences and available
+    (user_id, shift_id, preference_rank) rows of active students.
+    Candidates are the students with at least one available row, in order of
+    first appearance.
+    """
+    # Core execution on the session's connection: no ORM loading layer at all
+    connection = db.connection()
+    shifts = [
+        ShiftRecord(*row)
+        for row in connection.execute(select(*ShiftRecord.COLUMNS).where(models.Shift.is_active == True))
+    ]
+
+    preferences = [
+        PreferenceRecord(*row)
+        for row in connection.execute(
+            select(*PreferenceRecord.COLUMNS).where(models.StudentPreference.semester == semester)
+        )
+    ]
+
+    availability_entries = connection.execute(
+        available_rows(
+            select(models.Availability.user_id, models.Availability.shift_id, models.Availability.preference_rank),
+            semester
+        )
+    ).all()
+    student_ids = list(dict.fromkeys(row[0] for row in availability_entries))
+
+    return shifts, student_ids, preferences, availability_entries
@@ -0,0 +1,321 @@
+"""
+CP-SAT model construction for the schedule optimizer
+
+Builds per-shift and per-student adjacency indexes in a single pass over the
+availability rows, so construction time is proportional to the number of
+availability rows rather than students x shifts.
+"""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from ortools.sat.python import cp_model
+
+# Objective weights
+FILL_WEIGHT = 1000  # Filling a slot (highest priority)
+RANK_WEIGHT = 100  # Rank 1 = best (5 points), Rank 5 = worst (1 point)
+NEUTRAL_PREFERENCE_WEIGHT = 300  # No rank given
+FAIRNESS_WEIGHT = -50  # Penalty per additional shift on the same student: k times for the k-th
+
+DEFAULT_WEIGHTS = {
+    "fill": FILL_WEIGHT,
+    "rank": RANK_WEIGHT,
+    "neutral_preference": NEUTRAL_PREFERENCE_WEIGHT,
+    "fairness": FAIRNESS_WEIGHT,
+}
+
+# Soft-limit slack on student caps
+EXTRA_SHIFTS_ALLOWED = 2
+HOURS_OVERRUN_FACTOR = 1.5
+
+# StudentPreference default, also applied to students without preferences
+DEFAULT_MAX_SHIFTS_PER_DAY = 1
+
+
+def preference_weight(rank, weights: dict = DEFAULT_WEIGHTS) -> int:
+    """Objective points for assigning a student to a shift they ranked"""
+    return (6 - rank) * weights["rank"] if rank else weights["neutral_preference"]
+
+
+def fixed_objective(assignments, ranks: dict, weights: dict = DEFAULT_WEIGHTS) -> float:
+    """
+    Objective points of (student_id, shift_id) assignments held outside the
+    model (see fixed_load): fill and preference points, and the fairness
+    penalties of each student's first shifts. The model's fairness terms
+    for a student continue counting from their fixed load, so the two add
+    up to the objective of the whole schedule.
+    """
+    load = defaultdict(int)
+    value = 0
+    for key in assignments:
+        load[key[0]] += 1
+        value += weights["fill"] + preference_weight(ranks.get(key), weights)
+    # The i-th shift of a student (from 0) costs fairness * i
+    value += sum(weights["fairness"] * n * (n - 1) // 2 for n in load.values())
+    return float(value)
+
+
+def minute_of_day(value) -> int:
+    return value.hour * 60 + value.minute
+
+
+def duration_centihours(start_time, end_time) -> int:
+    """Shift length in hundredths of an hour (CP-SAT needs integer coefficients)"""
+    return (minute_of_day(end_time) - minute_of_day(start_time)) * 100 // 60
+
+
+def overlap_cliques(shift_info: dict) -> dict:
+    """
+    Maximal sets of mutually overlapping shifts, per day.
+
+    Shifts are half-open intervals [start, end) in minutes of the day, so one
+    ending at 12:00 does not overlap one starting at 12:00. A sweep over the
+    sorted start and end points emits the active set just before the first
+    end that follows a start; in an interval graph those are exactly the
+    maximal cliques, at most one per shift.
+    Returns day_of_week -> [[shift_id, ...], ...] (cliques of two or more shifts).
+    """
+    events = defaultdict(list)
+    for shift_id, (_, _, day, start, end) in shift_info.items():
+        events[day].append((start, 1, shift_id))
+        events[day].append((end, 0, shift_id))  # Ends sort before starts at the same minute
+
+    cliques = {}
+    for day, day_events in events.items():
+        active, grown, day_cliques = set(), False, []
+        for _, is_start, shift_id in sorted(day_events):
+            if is_start:
+                active.add(shift_id)
+                grown = True
+            else:
+                if grown and len(active) > 1:
+                    day_cliques.append(sorted(active))
+                grown = False
+                active.discard(shift_id)
+        if day_cliques:
+            cliques[day] = day_cliques
+    return cliques
+
+
+class ModelBuilder:
+    """
+    Builds the assignment model from pre-extracted scheduling data.
+
+    shift_info:     shift_id -> (required_students, duration in centi-hours,
+                    day_of_week, start minute, end minute)
+    student_limits: student_id -> (max_shifts_per_week, desired_hours_per_week,
+                    max_shifts_per_day); students without preferences for the
+                    semester are absent
+    fixed_load:     student_id -> (shifts, centi-hours, {day_of_week: shifts})
+                    already held outside the model (schedule repair); counted
+                    against the student's caps
+    weights:        overrides for DEFAULT_WEIGHTS (what-if scenarios)
+    caps:           (max_shifts_per_week, max centi-hours per week) hard caps on
+                    every student, either may be None (what-if scenarios); a
+                    student's own, softer caps still apply where stricter
+    """
+
+    def __init__(self, model: cp_model.CpModel, shift_info: dict, student_limits: dict, fixed_load: dict = None,
+                 weights: dict = None, caps: tuple = None):
+        self.model = model
+        self.shift_info = shift_info
+        self.student_limits = student_limits
+        self.fixed_load = fixed_load or {}
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.caps = caps or (None, None)
+        self.assignments = {}  # (student_id, shift_id) -> BoolVar
+        self.ranks = {}  # (student_id, shift_id) -> preference_rank
+        self.by_shift = defaultdict(list)  # shift_id -> [(student_id, BoolVar)]
+        self.by_student = defaultdict(list)  # student_id -> [(shift_id, BoolVar)]
+        self.shift_limits = {}  # student_id -> most shifts the model may give the student
+        self.timings = {}  # constraint family -> build time in ms
+
+    @contextmanager
+    def timed(self, family: str):
+        start = time.perf_counter()
+        yield
+        self.timings[family] = round((time.perf_counter() - start) * 1000, 2)
+
+    def build(self, rows, students, objective_mode: str = "weighted"):
+        """
+        rows: iterable of (student_id, shift_id, preference_rank) for available pairs
+        students: ids of students eligible for assignment
+        objective_mode: "weighted" sets the weighted-sum objective; "lexicographic"
+                        leaves it to the phased solve (see lexicographic.py)
+        """
+        self.add_variables(rows, students)
+        self.add_coverage_constraints()
+        self.add_student_limits()
+        self.add_day_limits()
+        if objective_mode == "weighted":
+            self.add_objective()
+        return self
+
+    def add_variables(self, rows, students):
+        # x[student, shift] = 1 if assigned; only pairs with an explicit
+        # availability record are candidates (opt-in)
+        with self.timed("variables"):
+            students = set(students)
+            for student_id, shift_id, rank in rows:
+                if student_id not in students or shift_id not in self.shift_info:
+                    continue
+                key = (student_id, shift_id)
+                if key in self.assignments:
+                    continue
+                var = self.model.NewBoolVar(f'assign_{student_id}_{shift_id}')
+                self.assignments[key] = var
+                self.ranks[key] = rank
+                self.by_shift[shift_id].append((student_id, var))
+                self.by_student[student_id].append((shift_id, var))
+
+    def add_coverage_constraints(self):
+        # C1: Shift Coverage
+        # Assign AT MOST required_students; the objective tries to fill it
+        with self.timed("coverage"):
+            for shift_id, (required_students, *_) in self.shift_info.items():
+                candidates = self.by_shift.get(shift_id)
+                if not candidates:
+                    continue
+                self.model.Add(cp_model.LinearExpr.Sum([var for _, var in candidates]) <= required_students)
+
+    def add_student_limits(self):
+        # C2: Student Max Hours / Max Shifts, with slack so they act as soft caps;
+        # scenario caps are hard and only tighten them
+        with self.timed("student_limits"):
+            cap_shifts, cap_hours = self.caps
+            for student_id, student_shifts in self.by_student.items():
+                limits = self.student_limits.get(student_id)
+                shift_caps, hour_caps = [], []
+                if limits:
+                    max_shifts_per_week, desired_hours, _ = limits
+                    shift_caps.append(max_shifts_per_week + EXTRA_SHIFTS_ALLOWED)
+                    hour_caps.append(int(desired_hours * 100 * HOURS_OVERRUN_FACTOR))
+                if cap_shifts is not None:
+                    shift_caps.append(cap_shifts)
+                if cap_hours is not None:
+                    hour_caps.append(cap_hours)
+
+                fixed_shifts, fixed_hours, _ = self.fixed_load.get(student_id, (0, 0, {}))
+                shift_vars = [var for _, var in student_shifts]
+                if shift_caps:
+                    shift_limit = max(0, min(shift_caps) - fixed_shifts)
+                    self.shift_limits[student_id] = shift_limit
+                    self.model.Add(cp_model.LinearExpr.Sum(shift_vars) <= shift_limit)
+                if hour_caps:
+                    scaled_limit = max(0, min(hour_caps) - fixed_hours)
+                    durations = [self.shift_info[shift_id][1] for shift_id, _ in student_shifts]
+                    self.model.Add(cp_model.LinearExpr.WeightedSum(shift_vars, durations) <= scaled_limit)
+
+    def add_day_limits(self):
+        # C3: Max shifts per day, and never two overlapping shifts.
+        # Overlaps use one at-most-one per maximal clique of the day's shifts
+        # rather than one constraint per overlapping pair.
+        with self.timed("day_limits"):
+            clique_ids = defaultdict(list)  # shift_id -> [(day, clique index)]
+            for day, day_cliques in overlap_cliques(self.shift_info).items():
+                for i, clique in enumerate(day_cliques):
+                    for shift_id in clique:
+                        clique_ids[shift_id].append((day, i))
+
+            for student_id, student_shifts in self.by_student.items():
+                limits = self.student_limits.get(student_id)
+                max_per_day = (limits[2] if limits else None) or DEFAULT_MAX_SHIFTS_PER_DAY
+                fixed_days = self.fixed_load.get(student_id, (0, 0, {}))[2]
+
+                by_day = defaultdict(list)
+                for shift_id, var in student_shifts:
+                    by_day[self.shift_info[shift_id][2]].append((shift_id, var))
+
+                for day, day_shifts in by_day.items():
+                    day_limit = max(0, max_per_day - fixed_days.get(day, 0))
+                    if len(day_shifts) > day_limit:
+                        self.model.Add(cp_model.LinearExpr.Sum([var for _, var in day_shifts]) <= day_limit)
+                    if day_limit < 2:
+                        continue  # The day cap already rules out overlaps
+
+                    restricted = defaultdict(list)
+                    for shift_id, var in day_shifts:
+                        for clique in clique_ids.get(shift_id, ()):
+                            restricted[clique].append(var)
+                    # Cliques restricted to the student's shifts may nest; keep the largest
+                    kept = []
+                    for clique_vars in sorted(restricted.values(), key=len, reverse=True):
+                        members = {var.Index() for var in clique_vars}
+                        if len(members) > 1 and not any(members <= other for other in kept):
+                            kept.append(members)
+                            self.model.AddAtMostOne(clique_vars)
+
+    def add_hints(self, prior_assignments) -> int:
+        """
+        Seed the search with a previous roster: pairs in prior_assignments are
+        hinted 1, every other candidate 0. Returns the number of pairs kept.
+        """
+        with self.timed("hints"):
+            prior_assignments = set(prior_assignments)
+            kept = 0
+            for key, var in self.assignments.items():
+                if key in prior_assignments:
+                    self.model.AddHint(var, 1)
+                    kept += 1
+                else:
+                    self.model.AddHint(var, 0)
+        return kept
+
+    def add_objective(self):
+        # Priority 1: Fill all shifts
+        # Priority 2: Maximize preference satisfaction
+        # Priority 3: Distribute evenly (the k-th shift of a student costs the
+        # fairness weight k times, whichever shifts they are)
+        with self.timed("objective"):
+            variables, weights = [], []
+            for key, var in self.assignments.items():
+                variables.append(var)
+                weights.append(self.weights["fill"] + preference_weight(self.ranks[key], self.weights))
+
+            for student_id, student_shifts in self.by_student.items():
+                fixed_shifts = self.fixed_load.get(student_id, (0, 0, {}))[0]
+                most = min(len(student_shifts), self.shift_limits.get(student_id, len(student_shifts)))
+                # Layer k is set for a student holding more than k shifts; the
+                # cost grows with k, so layers fill in order
+                layers = [
+                    self.model.NewBoolVar(f'load_{student_id}_{k}')
+                    for k in range(max(1, fixed_shifts), fixed_shifts + most)
+                ]
+                if not layers:
+                    continue
+                shift_vars = [var for _, var in student_shifts]
+                first = [self.model.NewBoolVar(f'load_{student_id}_0')] if not fixed_shifts else []
+                self.model.Add(cp_model.LinearExpr.Sum(shift_vars) == cp_model.LinearExpr.Sum(first + layers))
+                for k, layer in enumerate(layers, start=max(1, fixed_shifts)):
+                    variables.append(layer)
+                    weights.append(self.weights["fairness"] * k)
+
+            self.model.Maximize(cp_model.LinearExpr.WeightedSum(variables, weights))
+
+    # Objective components for the lexicographic mode
+
+    def coverage_expr(self):
+        """Number of filled slots"""
+        return cp_model.LinearExpr.Sum(list(self.assignments.values()))
+
+    def preference_expr(self):
+        """Total preference points of the assignment"""
+        variables = list(self.assignments.values())
+        weights = [preference_weight(self.ranks[key], self.weights) for key in self.assignments]
+        return cp_model.LinearExpr.WeightedSum(variables, weights)
+
+    def max_load_var(self):
+        """IntVar bounded below by every student's load in centi-hours (including fixed load)"""
+        with self.timed("max_load"):
+            loads = []
+            for student_id, student_shifts in self.by_student.items():
+                fixed_hours = self.fixed_load.get(student_id, (0, 0, {}))[1]
+                durations = [self.shift_info[shift_id][1] for shift_id, _ in student_shifts]
+                loads.append((student_shifts, durations, fixed_hours))
+
+            upper = max((sum(durations) + fixed for _, durations, fixed in loads), default=0)
+            max_load = self.model.NewIntVar(0, upper, "max_load")
+            for student_shifts, durations, fixed_hours in loads:
+                shift_vars = [var for _, var in student_shifts]
+                self.model.Add(cp_model.LinearExpr.WeightedSum(shift_vars, durations) + fixed_hours <= max_load)
+        return max_load
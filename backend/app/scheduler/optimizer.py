@@ -1,200 +1,692 @@
 from ortools.sat.python import cp_model
 from sqlalchemy.orm import Session
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import multiprocessing
+import time
 from .. import models
-from datetime import datetime
-import pandas as pd
+from .model_builder import ModelBuilder, duration_centihours, minute_of_day, fixed_objective
+from .decomposition import (
+    connected_components, pack_components, solve_subproblem, init_worker, COMPONENT_WORKERS, DECOMPOSE_MIN_ROWS
+)
+from .solver_profiles import get_profile, ALGORITHM_VERSION
+from .solution_writer import write_assignments
+from .lexicographic import solve_lexicographic
+from .pruning import prune_candidates
+from .loader import load_semester, count_semester
+from .flow import solve_min_cost_flow
+from .symmetry import AggregateModelBuilder, equivalence_classes, aggregated_size, AGGREGATE_MIN_REDUCTION
+from . import result_cache, diagnostics
+
+
+# Recorded in Schedule.algorithm_version for repaired drafts
+REPAIR_VERSION = "v2_repair"
+# ...for drafts solved with the lexicographic objective
+LEXICOGRAPHIC_VERSION = "v2_lexico"
+# ...for drafts solved by the min-cost-flow engine
+MCF_VERSION = "v2_flow"
+# ...for CP-SAT solves warm-started from a min-cost flow
+HYBRID_VERSION = "v2_hybrid"
+# ...and for drafts saved from a what-if scenario variant
+SCENARIO_VERSION = "v2_scenario"
+
 
 class ScheduleOptimizer:
-    def __init__(self, db: Session, semester: str, user_id: str):
+    def __init__(self, db: Session, semester: str, user_id: str, progress=None, solver_profile: str = None,
+                 warm_start: bool = False, warm_start_schedule_id: str = None, decompose: bool = None,
+                 force_refresh: bool = False, objective_mode: str = "weighted", engine: str = "cpsat",
+                 aggregate: bool = None):
         self.db = db
         self.semester = semester
         self.user_id = user_id
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
+        self.profile = get_profile(solver_profile)
+        self.profile.apply(self.solver)
         self.assignments = {} # (student_id, shift_id) -> BoolVar
+        self.build_timings = {} # constraint family -> ms
+        self.progress = progress # Optional callable(stage, percent)
+        self.warm_start = warm_start # Hint from the latest draft for the semester
+        self.warm_start_schedule_id = warm_start_schedule_id # ...or from this schedule
+        self.decompose = decompose # None = split into components for large semesters
+        self.force_refresh = force_refresh # Solve even if the result cache has these inputs
+        self.objective_mode = objective_mode # "weighted" sum or "lexicographic" phases
+        self.engine = engine # "cpsat", "mcf" (min-cost flow) or "hybrid" (CP-SAT hinted by min-cost flow)
+        self.aggregate = aggregate # Model interchangeable students as classes; None = when it shrinks the model
+        self.builder = None
+        self.phases = [] # Per-phase results of a lexicographic solve
+        self.lexicographic_chosen = [] # ...and the assignments of its last solved phase
+        self.cache_hit = False
+        self.timings = {} # stage (load, build, solve, save) -> seconds
+        self.run_stats = {} # solver outcome and model size for the SolverRun record
+        self.diagnostics = None # Pre-solve feasibility report
+        self.objective_value = None
+        self.ranks = {} # (student_id, shift_id) -> preference_rank, for assignment scores
+        self.write_stats = {} # rows written and write duration
+        self.component_pool = None
+        self.stop_event = None # Shared with component workers; set on cancel
+        self.cancelled = False
 
-    def generate(self):
-        # 1. Fetch Data
-        shifts = self.db.query(models.Shift).filter(models.Shift.is_active == True).all()
-        
-        # Get all students who have availability for this semester
-        # Changed from join with preferences to join with availability
-        students = self.db.query(models.User).join(models.Availability).filter(
-            models.User.role == "student",
-            models.User.is_active == True,
-            models.Availability.semester == self.semester,
-            models.Availability.is_available == True
-        ).distinct().all()
-        
-        availability_entries = self.db.query(models.Availability).filter(
-            models.Availability.semester == self.semester
-        ).all()
-        
-        # Map availability: (user_id, shift_id) -> is_available
-        avail_map = {}
-        for a in availability_entries:
-            avail_map[(a.user_id, a.shift_id)] = (a.is_available, a.preference_rank)
-            
-        print(f"Found {len(shifts)} shifts and {len(students)} students.")
-
-
-        # 2. Create Variables
-        # x[student, shift] = 1 if assigned
-        for student in students:
-            for shift in shifts:
-                # Check if available
-                is_avail, rank = avail_map.get((student.id, shift.id), (True, None)) # Default available?
-                # If explicitly not available, can't assign.
-                # If no availability record, assume available or not? 
-                # Usually assume NOT available if not set? Or Available?
-                # Let's assume Valid Submission Required -> So if not in map, maybe assume unavailable?
-                # For now, if no record, we assume unavailable to be safe (opt-in).
-                if not is_avail:
-                    continue
-                if (student.id, shift.id) not in avail_map:
-                    # Student didn't say anything. Let's look at implementation plan.
-                    # Plan says "Honor is_available=False".
-                    # Let's assume if no record, they are NOT available.
-                    continue
-
-                self.assignments[(student.id, shift.id)] = self.model.NewBoolVar(f'assign_{student.id}_{shift.id}')
-        
-        # 3. Constraints
-        
-        # C1: Shift Coverage
-        # Each shift should have required_students, but can have fewer if not enough candidates
-        for shift in shifts:
-            candidates = [self.assignments[(s.id, shift.id)] for s in students if (s.id, shift.id) in self.assignments]
-            if len(candidates) == 0:
-                print(f"Warning: Shift {shift.day_name} {shift.start_time} has no available students!")
-                continue
-            
-            # Flexible constraint: Assign AT MOST required_students, but try to fill it
-            # Don't force exact match - this makes it more flexible
-            target = min(len(candidates), shift.required_students)
-            # Only require we don't exceed the required number
-            self.model.Add(sum(candidates) <= shift.required_students)
-
-        # C2: Student Max Hours / Max Shifts (Make these SOFT constraints)
-        for student in students:
-            student_shifts = [self.assignments[(student.id, s.id)] for s in shifts if (student.id, s.id) in self.assignments]
-            
-            if not student_shifts:
-                continue
-                
-            prefs = next((p for p in student.preferences if p.semester == self.semester), None)
-            if prefs:
-                # Max shifts per week - soft constraint (try not to exceed but allow if needed)
-                self.model.Add(sum(student_shifts) <= prefs.max_shifts_per_week + 2)  # Allow some flexibility
-                
-                # Max hours - soft constraint
-                scaled_limit = int(prefs.desired_hours_per_week * 100)
-                scaled_expr = sum(self.assignments[(student.id, s.id)] * int(s.duration_hours * 100) for s in shifts if (student.id, s.id) in self.assignments)
-                # Allow going over by 50% if needed
-                self.model.Add(scaled_expr <= int(scaled_limit * 1.5))
-
-        # C3: Fairness - Try to distribute shifts evenly among students
-        # Calculate average assignments per student
-        total_required = sum(shift.required_students for shift in shifts)
-        num_students = len(students)
-        if num_students > 0:
-            avg_per_student = max(1, total_required // num_students)
-            
-            # Each student should get at least some shifts if available
-            for student in students:
-                student_shifts = [self.assignments[(student.id, s.id)] for s in shifts if (student.id, s.id) in self.assignments]
-                if student_shifts:
-                    # Try to give each student at least 1 shift if they're available for any
-                    # But don't make it a hard requirement
-                    pass  # Handled by objective
-
-        # 4. Objective: Multi-criteria optimization
-        # Priority 1: Fill all shifts (maximize total assignments)
-        # Priority 2: Maximize preference satisfaction
-        # Priority 3: Distribute evenly
-        
-        objective_terms = []
-        
-        # Weight for filling shifts (highest priority)
-        fill_weight = 1000
-        for (sid, shid), var in self.assignments.items():
-            objective_terms.append(var * fill_weight)
-        
-        # Weight for preferences (medium priority)
-        for (sid, shid), var in self.assignments.items():
-            _, rank = avail_map.get((sid, shid), (True, None))
-            if rank:
-                # Rank 1 = best (5 points), Rank 5 = worst (1 point)
-                pref_weight = (6 - rank) * 100
-            else:
-                pref_weight = 300  # Neutral preference
-            objective_terms.append(var * pref_weight)
-        
-        # Weight for fairness - penalize having too many shifts on one student
-        fairness_weight = -50  # Negative weight to penalize imbalance
-        for student in students:
-            student_shifts = [self.assignments[(student.id, s.id)] for s in shifts if (student.id, s.id) in self.assignments]
-            if len(student_shifts) > 1:
-                # Penalize the square of assignments to encourage distribution
-                # This is approximate since we can't do squares in CP-SAT directly
-                # Instead, penalize each additional assignment
-                for i, var in enumerate(student_shifts):
-                    objective_terms.append(var * fairness_weight * i)
-            
-        self.model.Maximize(sum(objective_terms))
-
-
-        # 5. Solve
+    def report(self, stage: str, percent: int):
+        """Forward stage changes to the progress callback, if any"""
+        if self.progress:
+            self.progress(stage, percent)
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Accumulate the wall time of an optimizer stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = round(self.timings.get(stage, 0) + time.perf_counter() - start, 4)
+
+    def cancel(self):
+        """
+        Request cancellation. Safe to call from another thread:
+        a running CP-SAT search is stopped and no schedule is saved.
+        """
+        self.cancelled = True
+        self.solver.StopSearch()
+        if self.stop_event is not None:
+            # Running subproblem searches stop at their next poll
+            self.stop_event.set()
+        if self.component_pool:
+            # ...and queued ones are dropped
+            self.component_pool.shutdown(wait=False, cancel_futures=True)
+
+    def hint_schedule_id(self):
+        """Id of the schedule to warm-start from, or None"""
+        if self.warm_start_schedule_id:
+            return str(self.warm_start_schedule_id)
+        if not self.warm_start:
+            return None
+        schedule_id = self.db.query(models.Schedule.id).filter(
+            models.Schedule.semester == self.semester,
+            models.Schedule.status == 'draft'
+        ).order_by(models.Schedule.created_at.desc()).limit(1).scalar()
+        if schedule_id is None:
+            print("Warm start requested but no draft exists for this semester.")
+        return schedule_id
+
+    def load_hint_assignments(self, schedule_id: str = None):
+        """(student_id, shift_id) pairs of the schedule to warm-start from, or None"""
+        if schedule_id is None:
+            return None
+        return self.db.query(
+            models.ScheduleAssignment.user_id, models.ScheduleAssignment.shift_id
+        ).filter(models.ScheduleAssignment.schedule_id == schedule_id).all()
+
+    def load_data(self):
+        """
+        Fetch active shifts, candidate student ids, semester preferences and
+        the available (user_id, shift_id, preference_rank) rows, as lightweight
+        column records (see loader)
+        """
+        shifts, student_ids, preferences, availability_entries = load_semester(self.db, self.semester)
+        # Rows are unpacked positionally; named attribute access is several times slower
+        self.ranks = {(user_id, shift_id): rank for user_id, shift_id, rank in availability_entries}
+
+        print(f"Found {len(shifts)} shifts and {len(student_ids)} students.")
+        return shifts, student_ids, preferences, availability_entries
+
+    def model_inputs(self, shifts, preferences):
+        """Plain per-shift and per-student data the model builder works from"""
+        shift_info = {
+            shift.id: (
+                shift.required_students, duration_centihours(shift.start_time, shift.end_time),
+                shift.day_of_week, minute_of_day(shift.start_time), minute_of_day(shift.end_time)
+            )
+            for shift in shifts
+        }
+        student_limits = {
+            p.user_id: (p.max_shifts_per_week, p.desired_hours_per_week, p.max_shifts_per_day) for p in preferences
+        }
+        return shift_info, student_limits
+
+    def diagnose(self, shifts, student_ids, preferences, rows):
+        """
+        Vectorized pre-solve checks over the availability matrix of the
+        (student_id, shift_id, rank) candidate rows left after pruning
+        """
+        matrix = diagnostics.availability_matrix(student_ids, [shift.id for shift in shifts], rows)
+        self.diagnostics = diagnostics.diagnose(
+            matrix, shifts, student_ids, {p.user_id: p for p in preferences}
+        )
+        for message in self.diagnostics["errors"]:
+            print(f"Error: {message}")
+        for message in self.diagnostics["warnings"]:
+            print(f"Warning: {message}")
+        return self.diagnostics
+
+    def reject(self, message: str):
+        """Record why a request was refused before solving, in the diagnostics report's shape"""
+        print(f"Error: {message}")
+        self.diagnostics = {"feasible": False, "errors": [message], "warnings": []}
+
+    def candidate_rows(self, shift_info, student_ids, availability_entries):
+        """(student_id, shift_id, rank) tuples for eligible students on active shifts"""
+        eligible = set(student_ids)
+        return [
+            (user_id, shift_id, rank) for user_id, shift_id, rank in availability_entries
+            if user_id in eligible and shift_id in shift_info
+        ]
+
+    def prune_rows(self, rows, shifts, preferences, fixed_load=None):
+        """Drop candidate rows the students' preferences rule out, recording how many per reason"""
+        rows, pruned = prune_candidates(rows, shifts, preferences, fixed_load)
+        self.run_stats["pruned_rows"] = pruned
+        print(f"Pruned {sum(pruned.values())} ineligible candidates {pruned}")
+        return rows
+
+    def build_model(self, shift_info, student_limits, rows, student_ids, fixed_load=None):
+        """Variables, constraints and objective from one pass over availability"""
+        if fixed_load is None and self.objective_mode == "weighted" and self.aggregate is not False:
+            classes = equivalence_classes(rows, student_ids, shift_info, student_limits)
+            size = aggregated_size(classes)
+            if self.aggregate or size <= len(rows) * (1 - AGGREGATE_MIN_REDUCTION):
+                print(f"Aggregated {len(student_ids)} students into {len(classes)} classes "
+                      f"({size} count variables instead of {len(rows)})")
+                builder = AggregateModelBuilder(self.model, shift_info, student_limits).build(classes)
+                self.run_stats["student_classes"] = len(classes)
+                self.builder = builder
+                self.assignments = builder.counts
+                self.build_timings = builder.timings
+                return builder
+
+        builder = ModelBuilder(self.model, shift_info, student_limits, fixed_load=fixed_load)
+        builder.build(rows, student_ids, objective_mode=self.objective_mode)
+        self.builder = builder
+        self.assignments = builder.assignments
+        self.build_timings = builder.timings
+        return builder
+
+    def solve(self) -> bool:
+        """Run CP-SAT; True if a solution was found and not cancelled"""
+        if self.cancelled:
+            return False
+        self.report("solving", 50)
+        print(f"Solving with profile '{self.profile.name}' ({self.profile.workers} workers, "
+              f"{self.profile.max_time_in_seconds}s budget, gap {self.profile.relative_gap_limit})")
+        if self.objective_mode == "lexicographic":
+            return self.solve_lexicographic()
         status = self.solver.Solve(self.model)
-        
+        self.record_model_stats()
+
+        if self.cancelled:
+            print("Solve cancelled.")
+            return False
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            print(f"Solution found! Objective value: {self.solver.ObjectiveValue()}")
-            return self.save_solution(shifts, students)
-        else:
+            self.objective_value = self.solver.ObjectiveValue()
+            self.run_stats["best_bound"] = self.solver.BestObjectiveBound()
+            print(f"Solution found! Objective value: {self.objective_value}")
+            return True
+        print("No solution found.")
+        return False
+
+    def solve_lexicographic(self) -> bool:
+        """Coverage, then preference, then max load, within the profile's time budget"""
+        result = solve_lexicographic(
+            self.model, self.builder, self.solver, self.profile.max_time_in_seconds,
+            is_cancelled=lambda: self.cancelled
+        )
+        self.phases = result["phases"]
+        self.record_model_stats(status=result["status"])
+        for phase in self.phases:
+            print(f"  phase {phase['phase']}: {phase['status']} value={phase['value']} in {phase['seconds']}s")
+
+        if self.cancelled:
+            print("Solve cancelled.")
+            return False
+        if result["objective"] is None:
             print("No solution found.")
+            return False
+        self.lexicographic_chosen = result["chosen"]
+        self.objective_value = result["objective"]
+        print(f"Solution found! Objective value: {self.objective_value}")
+        return True
+
+    def record_model_stats(self, status: str = None):
+        """Model size and final status of a single-model solve"""
+        self.run_stats.update(
+            status=status or self.solver.StatusName(),
+            variables=len(self.assignments),
+            constraints=len(self.model.Proto().constraints),
+            workers=self.profile.workers,
+        )
+
+    def solve_flow(self, shift_info, student_limits, rows):
+        """
+        Min-cost-flow solution of the pure assignment problem, as chosen
+        (student_id, shift_id) pairs; None if the flow could not be solved
+        """
+        result = solve_min_cost_flow(shift_info, student_limits, rows)
+        print(f"Min-cost flow: {result['status']} with {len(result['chosen'])} assignments "
+              f"({result['arcs']} arcs) in {result['seconds'] * 1000:.1f} ms")
+        if result["objective"] is None:
+            return None
+        if self.engine == "mcf":
+            self.objective_value = result["objective"]
+            self.run_stats.update(status=result["status"], variables=result["arcs"], workers=1)
+        return result["chosen"]
+
+    def split_components(self, rows):
+        """
+        Connected components of the availability graph, or None when the
+        semester should be solved as a single model
+        """
+        if self.decompose is False:
+            return None
+        if self.decompose is None and len(rows) < DECOMPOSE_MIN_ROWS:
+            return None
+
+        components = connected_components(rows)
+        if len(components) < 2 or COMPONENT_WORKERS < 2:
+            return None
+        return components
+
+    def solve_decomposed(self, shift_info, student_limits, components, hint_assignments=None):
+        """
+        Solve independent components concurrently in a process pool and merge them.
+        Returns the chosen (student_id, shift_id) pairs, or None if cancelled.
+        """
+        batches = pack_components(components, COMPONENT_WORKERS)
+        workers = max(1, self.profile.workers // len(batches))
+        hints = set(hint_assignments) if hint_assignments is not None else None
+        print(f"Solving {len(components)} independent components in {len(batches)} batches "
+              f"({workers} search workers each)")
+
+        self.report("solving", 50)
+        futures = []
+        context = multiprocessing.get_context("spawn")
+        self.stop_event = context.Event()
+        self.component_pool = ProcessPoolExecutor(
+            max_workers=len(batches), mp_context=context, initializer=init_worker, initargs=(self.stop_event,)
+        )
+        if self.cancelled:
+            # Cancelled while the pool was being created
+            self.stop_event.set()
+        try:
+            for batch in batches:
+                batch_shifts = {shift_id for _, shift_id, _ in batch}
+                batch_students = {student_id for student_id, _, _ in batch}
+                batch_hints = None
+                if hints is not None:
+                    batch_hints = [(sid, shid) for sid, shid, _ in batch if (sid, shid) in hints]
+                futures.append(self.component_pool.submit(
+                    solve_subproblem,
+                    {sid: shift_info[sid] for sid in batch_shifts},
+                    {sid: student_limits[sid] for sid in batch_students if sid in student_limits},
+                    batch, self.profile.name, workers, batch_hints, self.objective_mode
+                ))
+            results = [future.result() for future in futures]
+        except Exception:
+            if self.cancelled:
+                print("Solve cancelled.")
+                return None
+            raise
+        finally:
+            self.component_pool.shutdown(wait=False, cancel_futures=True)
+            self.component_pool = None
+            self.stop_event = None
+
+        if self.cancelled:
+            print("Solve cancelled.")
+            return None
+
+        chosen = []
+        for result in results:
+            chosen.extend(result["chosen"])
+        self.objective_value = sum(result["objective"] for result in results)
+        statuses = sorted({result["status"] for result in results})
+        if len(statuses) == 1:
+            merged_status = statuses[0]
+        elif set(statuses) <= {"OPTIMAL", "FEASIBLE"}:
+            merged_status = "FEASIBLE"
+        else:
+            merged_status = "PARTIAL" # Some subproblems found no solution
+        self.run_stats.update(
+            status=merged_status,
+            variables=sum(result["variables"] for result in results),
+            constraints=sum(result["constraints"] for result in results),
+            workers=workers * len(batches),
+            components=len(components),
+            component_batches=len(batches),
+        )
+        if self.objective_mode == "weighted":
+            self.run_stats["best_bound"] = sum(result["best_bound"] for result in results)
+        print(f"Merged {len(results)} subproblems ({', '.join(statuses)}). Objective value: {self.objective_value}")
+        return chosen
+
+    def chosen_assignments(self):
+        """(student_id, shift_id) pairs set to 1 in the current solution"""
+        if self.objective_mode == "lexicographic":
+            # Values of the last phase that found a solution
+            return self.lexicographic_chosen
+        if isinstance(self.builder, AggregateModelBuilder):
+            return self.builder.expand(self.solver)
+        return [key for key, var in self.assignments.items() if self.solver.Value(var) == 1]
+
+    def generate(self):
+        # 1. Fetch Data
+        self.report("loading", 10)
+        with self.timed("load"):
+            shifts, student_ids, preferences, availability_entries = self.load_data()
+            if self.cancelled:
+                return None
+
+            shift_info, student_limits = self.model_inputs(shifts, preferences)
+            rows = self.candidate_rows(shift_info, student_ids, availability_entries)
+            self.run_stats.update(students=len(student_ids), shifts=len(shift_info), availability_rows=len(rows))
+            rows = self.prune_rows(rows, shifts, preferences)
+
+            # Reject obviously bad inputs before spending solver time
+            if not self.diagnose(shifts, student_ids, preferences, rows)["feasible"]:
+                return None
+
+        # Identical inputs return the cached result instead of solving again.
+        # The hint source is resolved first: "latest draft" moves as drafts are saved.
+        hint_schedule_id = self.hint_schedule_id() if self.engine != "mcf" else None
+        cache_key = result_cache.fingerprint(
+            shift_info, student_limits, rows, self.profile,
+            objective_mode=self.objective_mode, engine=self.engine, aggregate=self.aggregate,
+            decompose=self.decompose, hint_schedule_id=hint_schedule_id
+        )
+        if not self.force_refresh:
+            schedule = self.load_cached(cache_key)
+            if schedule is not None:
+                return schedule
+
+        if self.engine == "mcf":
+            with self.timed("solve"):
+                chosen = self.solve_flow(shift_info, student_limits, rows)
+            if not chosen:
+                return None
+            self.report("saving", 90)
+            schedule = self.save_solution(chosen)
+            self.store_cached(cache_key, chosen, schedule)
+            return schedule
+
+        self.report("building", 30)
+        hint_assignments = self.load_hint_assignments(hint_schedule_id)
+        if hint_assignments is None and self.engine == "hybrid":
+            with self.timed("build"):
+                hint_assignments = self.solve_flow(shift_info, student_limits, rows)
+
+        # Independent components are solved in parallel and merged
+        components = self.split_components(rows)
+        if components:
+            # Subproblems are built and solved in the workers
+            with self.timed("solve"):
+                chosen = self.solve_decomposed(shift_info, student_limits, components, hint_assignments)
+            if not chosen:
+                return None
+        else:
+            # 2-4. Build the model
+            with self.timed("build"):
+                builder = self.build_model(shift_info, student_limits, rows, student_ids)
+                if hint_assignments is not None:
+                    kept = builder.add_hints(hint_assignments)
+                    print(f"Warm start: {kept} of {len(hint_assignments)} prior assignments still possible.")
+            print(f"Built model with {len(self.assignments)} variables in {sum(self.build_timings.values()):.1f} ms {self.build_timings}")
+
+            # 5. Solve
+            with self.timed("solve"):
+                solved = self.solve()
+            if not solved:
+                return None
+            chosen = self.chosen_assignments()
+            if not chosen:
+                print("No assignment is possible; not saving an empty schedule.")
+                return None
+
+        self.report("saving", 90)
+        schedule = self.save_solution(chosen)
+        self.store_cached(cache_key, chosen, schedule)
+        return schedule
+
+    def load_cached(self, cache_key: str):
+        """
+        Schedule for a cached result: the draft it produced if that still
+        exists, otherwise a new draft from the cached assignments
+        """
+        entry = result_cache.get(cache_key)
+        if entry is None:
             return None
+        self.cache_hit = True
+        self.report("cached", 90)
+
+        if entry["schedule_id"]:
+            schedule = self.db.query(models.Schedule).filter(
+                models.Schedule.id == entry["schedule_id"],
+                models.Schedule.semester == self.semester,
+                models.Schedule.status == 'draft'
+            ).first()
+            if schedule:
+                print(f"Cache hit: inputs unchanged, reusing draft {schedule.id}")
+                return schedule
+
+        print("Cache hit: inputs unchanged, saving cached assignments")
+        self.objective_value = entry["objective"]
+        self.run_stats["status"] = "CACHED"
+        schedule = self.save_solution(entry["assignments"])
+        self.store_cached(cache_key, entry["assignments"], schedule)
+        return schedule
+
+    def store_cached(self, cache_key: str, chosen, schedule):
+        try:
+            result_cache.put(cache_key, chosen, self.objective_value, schedule.id)
+        except OSError as e:
+            # The cache is an optimization; never fail a generation over it
+            print(f"Warning: could not write solver result cache: {e}")
 
-    def save_solution(self, shifts, students):
-        # Fetch availability map again for preference ranks
-        availability_entries = self.db.query(models.Availability).filter(
-            models.Availability.semester == self.semester
-        ).all()
-        
-        avail_map = {}
-        for a in availability_entries:
-            avail_map[(a.user_id, a.shift_id)] = (a.is_available, a.preference_rank)
-        
-        # Create Schedule
+    def repair(self, base_schedule_id: str, shift_ids=(), student_ids=()):
+        """
+        Re-optimize only the neighbourhood of changed shifts and students.
+
+        Assignments of the base schedule outside the affected shifts are kept
+        as-is; the affected shifts are re-solved over every student who could
+        cover them, with caps reduced by each student's kept load.
+        Returns the new draft schedule, or None if the base schedule is gone
+        or no solution was found.
+        """
+        self.report("loading", 10)
+        # The job may run long after the request was accepted
+        base = self.db.query(models.Schedule.id).filter(
+            models.Schedule.id == base_schedule_id, models.Schedule.semester == self.semester
+        ).first()
+        if base is None:
+            self.reject(f"Base schedule {base_schedule_id} no longer exists")
+            return None
+
+        with self.timed("load"):
+            shifts, candidate_ids, preferences, availability_entries = self.load_data()
+            base_assignments = self.db.query(
+                models.ScheduleAssignment.user_id, models.ScheduleAssignment.shift_id
+            ).filter(models.ScheduleAssignment.schedule_id == base_schedule_id).all()
+
+        shifts_by_id = {shift.id: shift for shift in shifts}
+        # Availability the students' preferences still allow
+        eligible, _ = prune_candidates(availability_entries, shifts, preferences)
+        available = {(user_id, shift_id) for user_id, shift_id, _ in eligible}
+        candidate_ids = set(candidate_ids)
+        changed_students = {str(sid) for sid in student_ids}
+
+        # Affected: changed shifts, shifts held by changed students, and any
+        # base assignment that is no longer valid (shift inactive, availability
+        # withdrawn or ruled out by the student's preferences)
+        affected_shifts = {str(sid) for sid in shift_ids}
+        coverage = {}
+        for user_id, shift_id in base_assignments:
+            coverage[shift_id] = coverage.get(shift_id, 0) + 1
+            if (user_id in changed_students or shift_id not in shifts_by_id
+                    or (user_id, shift_id) not in available or user_id not in candidate_ids):
+                affected_shifts.add(shift_id)
+        # ...plus understaffed shifts a changed student can now cover
+        for row in availability_entries:
+            if row.user_id in changed_students:
+                shift = shifts_by_id.get(row.shift_id)
+                if shift and coverage.get(shift.id, 0) < shift.required_students:
+                    affected_shifts.add(shift.id)
+
+        kept = [(user_id, shift_id) for user_id, shift_id in base_assignments if shift_id not in affected_shifts]
+        fixed_load = {}
+        kept_by_student = {}
+        for user_id, shift_id in kept:
+            shift = shifts_by_id[shift_id]
+            count, hours, days = fixed_load.get(user_id, (0, 0, {}))
+            days[shift.day_of_week] = days.get(shift.day_of_week, 0) + 1
+            fixed_load[user_id] = (count + 1, hours + duration_centihours(shift.start_time, shift.end_time), days)
+            kept_by_student.setdefault(user_id, []).append(shift)
+
+        affected_active = [shifts_by_id[shift_id] for shift_id in affected_shifts if shift_id in shifts_by_id]
+        shift_info, student_limits = self.model_inputs(affected_active, preferences)
+        affected_rows = self.candidate_rows(shift_info, candidate_ids, availability_entries)
+        self.run_stats["availability_rows"] = len(affected_rows)
+        affected_rows = self.prune_rows(affected_rows, affected_active, preferences, fixed_load)
+        # A student cannot take a re-solved shift that overlaps one they keep
+        affected_rows = [
+            row for row in affected_rows
+            if not any(
+                held.day_of_week == shifts_by_id[row[1]].day_of_week
+                and held.start_time < shifts_by_id[row[1]].end_time
+                and shifts_by_id[row[1]].start_time < held.end_time
+                for held in kept_by_student.get(row[0], ())
+            )
+        ]
+        print(f"Repair: keeping {len(kept)} assignments, re-solving {len(affected_active)} shifts.")
+        self.run_stats.update(students=len(candidate_ids), shifts=len(shift_info))
+
+        self.report("building", 30)
+        with self.timed("build"):
+            builder = self.build_model(shift_info, student_limits, affected_rows, candidate_ids, fixed_load=fixed_load)
+            builder.add_hints(base_assignments)
+
+        with self.timed("solve"):
+            solved = self.solve()
+        if not solved:
+            return None
+        chosen = kept + self.chosen_assignments()
+
+        # The solve only scored the re-solved neighbourhood; add the kept
+        # assignments so the score covers the whole schedule
+        neighbourhood = self.objective_value
+        kept_value = fixed_objective(kept, self.ranks)
+        self.objective_value = neighbourhood + kept_value
+        if self.run_stats.get("best_bound") is not None:
+            self.run_stats["best_bound"] += kept_value
+        self.run_stats["neighbourhood_objective"] = neighbourhood
+
+        self.report("saving", 90)
+        return self.save_solution(
+            chosen,
+            notes=f"Repaired from schedule {base_schedule_id}",
+            version=REPAIR_VERSION
+        )
+
+    def save_solution(self, chosen, notes: str = None, version: str = None):
+        """Persist a draft schedule and its assignments in one transaction"""
+        if version is None:
+            if self.engine == "mcf":
+                version = MCF_VERSION
+            elif self.engine == "hybrid":
+                version = HYBRID_VERSION
+            elif self.objective_mode == "lexicographic":
+                version = LEXICOGRAPHIC_VERSION
+            else:
+                version = ALGORITHM_VERSION
         schedule = models.Schedule(
             semester=self.semester,
             status='draft',
             generated_by=self.user_id,
-            optimization_score=self.solver.ObjectiveValue(),
-            algorithm_version="v2_flexible"
+            optimization_score=self.objective_value,
+            algorithm_version=self.profile.algorithm_version(version),
+            notes=notes
         )
-        self.db.add(schedule)
-        self.db.flush() # Get ID
-
-        count = 0
-        for (sid, shid), var in self.assignments.items():
-            if self.solver.Value(var) == 1:
-                # Get preference rank from availability
-                _, pref_rank = avail_map.get((sid, shid), (True, None))
-                
-                assignment = models.ScheduleAssignment(
-                    schedule_id=schedule.id,
-                    shift_id=shid,
-                    user_id=sid,
-                    assignment_score=float(pref_rank) if pref_rank else None
-                )
-                self.db.add(assignment)
-                count += 1
-        
-        print(f"Created {count} assignments")
+        with self.timed("save"):
+            self.db.add(schedule)
+            self.db.flush() # Get ID
+
+            self.write_stats = write_assignments(self.db, schedule.id, chosen, self.ranks)
+        self.db.add(self.solver_run(schedule))
         self.db.commit()
+        print(f"Created {self.write_stats['rows']} assignments in {self.write_stats['seconds'] * 1000:.1f} ms")
         self.db.refresh(schedule)
         return schedule
 
-def generate_schedule(db: Session, semester: str, user_id: str):
-    optimizer = ScheduleOptimizer(db, semester, user_id)
+    def solver_run(self, schedule: models.Schedule) -> models.SolverRun:
+        """Telemetry record for a schedule produced by this optimizer"""
+        stats = self.run_stats
+        best_bound = stats.get("best_bound")
+        gap = None
+        if best_bound is not None and self.objective_value is not None:
+            gap = round(abs(best_bound - self.objective_value) / max(1.0, abs(best_bound)), 6)
+        parameters = {
+            "solver_profile": self.profile.name,
+            "workers": stats.get("workers", self.profile.workers),
+            "max_time_in_seconds": self.profile.max_time_in_seconds,
+            "relative_gap_limit": self.profile.relative_gap_limit,
+            "random_seed": self.profile.random_seed,
+            "objective_mode": self.objective_mode,
+            "engine": self.engine,
+            "warm_start": bool(self.warm_start or self.warm_start_schedule_id),
+            "cache_hit": self.cache_hit,
+        }
+        if "pruned_rows" in stats:
+            parameters["pruned_rows"] = stats["pruned_rows"]
+        if "student_classes" in stats:
+            parameters["student_classes"] = stats["student_classes"]
+        if "neighbourhood_objective" in stats:
+            parameters["neighbourhood_objective"] = stats["neighbourhood_objective"]
+        if "variant" in stats:
+            parameters["variant"] = stats["variant"]
+        if "components" in stats:
+            parameters.update(components=stats["components"], component_batches=stats["component_batches"])
+        if self.phases:
+            parameters["phases"] = self.phases
+        return models.SolverRun(
+            schedule_id=schedule.id,
+            semester=self.semester,
+            algorithm_version=schedule.algorithm_version,
+            status=stats.get("status"),
+            objective=self.objective_value,
+            best_bound=best_bound,
+            gap=gap,
+            students=stats.get("students"),
+            shifts=stats.get("shifts"),
+            availability_rows=stats.get("availability_rows"),
+            variables=stats.get("variables"),
+            constraints=stats.get("constraints"),
+            load_seconds=self.timings.get("load"),
+            build_seconds=self.timings.get("build"),
+            solve_seconds=self.timings.get("solve"),
+            save_seconds=self.timings.get("save"),
+            build_timings=self.build_timings or None,
+            parameters=parameters,
+        )
+
+def generate_schedule(db: Session, semester: str, user_id: str, progress=None, **options):
+    optimizer = ScheduleOptimizer(db, semester, user_id, progress=progress, **options)
     return optimizer.generate()
+
+def diagnose_semester(db: Session, semester: str):
+    """Pre-solve diagnostics for a semester without building a model"""
+    optimizer = ScheduleOptimizer(db, semester, None)
+    shifts, student_ids, preferences, availability_entries = optimizer.load_data()
+    shift_info, _ = optimizer.model_inputs(shifts, preferences)
+    rows = optimizer.candidate_rows(shift_info, student_ids, availability_entries)
+    rows = optimizer.prune_rows(rows, shifts, preferences)
+    return optimizer.diagnose(shifts, student_ids, preferences, rows)
+
+def precheck_semester(db: Session, semester: str):
+    """
+    Errors a generation request is refused on up front, from two COUNT queries.
+    The full diagnostics run inside the job, before any solver time is spent.
+    """
+    shifts, rows = count_semester(db, semester)
+    errors = []
+    if not shifts:
+        errors.append(diagnostics.NO_SHIFTS_ERROR)
+    if not rows:
+        errors.append(diagnostics.NO_STUDENTS_ERROR)
+    return errors
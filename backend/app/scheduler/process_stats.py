@@ -0,0 +1,72 @@
+"""
+Memory and CPU usage of solver process trees
+
+A job's solver process may start component or scenario pools, so limits
+apply to the whole tree. Usage is read from /proc on Linux; elsewhere the
+tree is just the root process and sampling reports nothing.
+"""
+
+import os
+from collections import defaultdict
+
+PAGE_MB = (os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096) / (1024 * 1024)
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _stat_fields(pid: int):
+    """Fields of /proc/<pid>/stat after the command name, or None"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # The command name is parenthesized and may itself contain spaces or parentheses
+    return stat.rsplit(")", 1)[1].split()
+
+
+def process_tree(pid: int):
+    """pid followed by all of its live descendants"""
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return [pid]
+
+    children = defaultdict(list)
+    for entry in entries:
+        if entry.isdigit():
+            fields = _stat_fields(int(entry))
+            if fields:
+                children[int(fields[1])].append(int(entry))
+
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, ()))
+    return tree
+
+
+def memory_mb(pids):
+    """
+    (total resident MB, largest single-process virtual MB) over pids.
+    Processes that exited meanwhile are skipped; (0, 0) without /proc.
+    """
+    resident = largest_virtual = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                size, rss = f.read().split()[:2]
+        except (OSError, ValueError):
+            continue
+        resident += int(rss)
+        largest_virtual = max(largest_virtual, int(size))
+    return resident * PAGE_MB, largest_virtual * PAGE_MB
+
+
+def cpu_seconds(pid: int) -> float:
+    """User plus system CPU time of one live process, 0 if unavailable"""
+    fields = _stat_fields(pid)
+    if not fields:
+        return 0.0
+    # utime and stime are fields 14 and 15 of the full stat line
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
@@ -0,0 +1,56 @@
+"""
+Candidate pruning before model construction
+
+Availability rows that a student's own preferences rule out are dropped
+before any variable is created:
+
+    weekend   weekend shifts for students who cannot work weekends
+    rotating  rotating shifts for students who cannot work rotating shifts
+    hours     shifts longer, on their own, than the student's hours cap
+
+Students without preferences for the semester declared nothing and keep all
+their rows. Hours pruning only removes variables the hours constraint would
+force to zero anyway; the shift-type rules are restrictions the model did
+not express before.
+"""
+
+from .model_builder import HOURS_OVERRUN_FACTOR, duration_centihours
+
+PRUNE_REASONS = ("weekend", "rotating", "hours")
+
+
+def prune_candidates(rows, shifts, preferences, fixed_load: dict = None):
+    """
+    Split (student_id, shift_id, rank) rows into the eligible ones and
+    per-reason counts of the pruned ones.
+    fixed_load is as for ModelBuilder; held hours count against the cap.
+    Returns (rows, {reason: count}).
+    """
+    fixed_load = fixed_load or {}
+    shift_types = {}
+    durations = {}
+    for shift in shifts:
+        shift_types[shift.id] = shift.shift_type
+        durations[shift.id] = duration_centihours(shift.start_time, shift.end_time)
+    by_student = {p.user_id: p for p in preferences}
+
+    kept = []
+    pruned = dict.fromkeys(PRUNE_REASONS, 0)
+    for row in rows:
+        student_id, shift_id, _ = row
+        preference = by_student.get(student_id)
+        reason = None
+        if preference is not None:
+            shift_type = shift_types.get(shift_id)
+            hours_limit = int(preference.desired_hours_per_week * 100 * HOURS_OVERRUN_FACTOR)
+            if shift_type == "weekend" and not preference.can_work_weekends:
+                reason = "weekend"
+            elif shift_type == "rotating" and not preference.can_work_rotating:
+                reason = "rotating"
+            elif durations.get(shift_id, 0) > hours_limit - fixed_load.get(student_id, (0, 0, {}))[1]:
+                reason = "hours"
+        if reason:
+            pruned[reason] += 1
+        else:
+            kept.append(row)
+    return kept, pruned
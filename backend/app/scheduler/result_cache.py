@@ -0,0 +1,106 @@
+"""
+Content-addressed cache of solver results
+
+Results are keyed by a SHA-256 fingerprint of everything that shapes the
+model: active shifts, availability rows, preferences, objective weights, the
+solver profile and the run configuration (engine, decomposition, warm-start
+schedule). Entries are small JSON files; the directory is kept under
+a size budget by evicting the least recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from . import model_builder
+from .solver_profiles import ALGORITHM_VERSION
+
+CACHE_DIR = os.getenv("SCHEDULER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "workforce-solver-cache"))
+# Total size budget for cached results (0 disables the cache)
+CACHE_MAX_BYTES = int(os.getenv("SCHEDULER_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def fingerprint(shift_info: dict, student_limits: dict, rows, profile, **extra) -> str:
+    """
+    Deterministic digest of the optimizer inputs.
+    rows are (student_id, shift_id, preference_rank) tuples; order does not matter.
+    extra holds run options that change the result, e.g. engine or the warm-start schedule id.
+    """
+    payload = {
+        "version": ALGORITHM_VERSION,
+        "weights": [
+            model_builder.FILL_WEIGHT, model_builder.RANK_WEIGHT, model_builder.NEUTRAL_PREFERENCE_WEIGHT,
+            model_builder.FAIRNESS_WEIGHT, model_builder.EXTRA_SHIFTS_ALLOWED, model_builder.HOURS_OVERRUN_FACTOR,
+        ],
+        "profile": [profile.name, profile.max_time_in_seconds, profile.relative_gap_limit, profile.random_seed],
+        "shifts": sorted([shift_id, *info] for shift_id, info in shift_info.items()),
+        "students": sorted([student_id, *limits] for student_id, limits in student_limits.items()),
+        "availability": sorted((student_id, shift_id, rank or 0) for student_id, shift_id, rank in rows),
+        "extra": extra,
+    }
+    encoded = json.dumps(payload, separators=(",", ":"), sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def get(key: str):
+    """Cached entry for a fingerprint, or None. A hit refreshes its LRU position."""
+    if CACHE_MAX_BYTES <= 0:
+        return None
+    path = _path(key)
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    entry["assignments"] = [tuple(pair) for pair in entry["assignments"]]
+    return entry
+
+
+def put(key: str, assignments, objective: float, schedule_id: str = None):
+    """Store a result, then evict least recently used entries beyond the size budget"""
+    if CACHE_MAX_BYTES <= 0:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    entry = {
+        "assignments": [list(pair) for pair in assignments],
+        "objective": objective,
+        "schedule_id": schedule_id,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    # Write-then-rename so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(entry, f, separators=(",", ":"))
+    os.replace(tmp_path, _path(key))
+    evict()
+
+
+def evict(max_bytes: int = None):
+    """Delete least recently used entries until the cache fits its budget"""
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            stat = os.stat(os.path.join(CACHE_DIR, name))
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(CACHE_DIR, name))
+        except OSError:
+            pass
+        total -= size
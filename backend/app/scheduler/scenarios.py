@@ -0,0 +1,198 @@
+"""
+Batch "what-if" scenario solving
+
+Semester data is loaded once; each variant (required_students overrides,
+capacity caps, objective weights, solver profile) is applied to plain copies
+of the model inputs and solved in its own worker process. Scenarios run as
+background jobs, like generation. Only comparative metrics are kept, on the
+job; a draft is persisted only for the variant the caller names in
+persist_variant.
+"""
+
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from ortools.sat.python import cp_model
+from sqlalchemy.orm import Session
+
+from .model_builder import ModelBuilder
+from .decomposition import init_worker, stop_on_request, stop_requested
+from .optimizer import ScheduleOptimizer, SCENARIO_VERSION
+from .solver_profiles import get_profile
+
+# Variants solved concurrently per scenario request
+SCENARIO_WORKERS = int(os.getenv("SCHEDULER_SCENARIO_WORKERS", str(os.cpu_count() or 1)))
+
+
+def apply_variant(shift_info: dict, variant: dict):
+    """
+    Copy of shift_info with the variant's required_students overrides, and
+    the variant's (max_shifts_per_week, max centi-hours) caps for ModelBuilder.
+    Caps are hard and only ever tighten a student's own limits.
+    """
+    shift_info = dict(shift_info)
+    for shift_id, required in (variant.get("required_students") or {}).items():
+        if shift_id in shift_info:
+            shift_info[shift_id] = (required, *shift_info[shift_id][1:])
+
+    max_hours = variant.get("max_hours_per_week")
+    caps = (variant.get("max_shifts_per_week"), None if max_hours is None else int(max_hours * 100))
+    return shift_info, caps
+
+
+def solve_variant(shift_info: dict, student_limits: dict, rows, student_ids, variant: dict,
+                  search_workers: int = None) -> dict:
+    """
+    Build, solve and score one variant.
+    Runs in a worker process, so it takes and returns plain data only.
+    """
+    shift_info, caps = apply_variant(shift_info, variant)
+    profile = get_profile(variant.get("solver_profile") or "fast")
+
+    model = cp_model.CpModel()
+    builder = ModelBuilder(model, shift_info, student_limits, weights=variant.get("weights"), caps=caps)
+    builder.build(rows, student_ids)
+
+    solver = cp_model.CpSolver()
+    profile.apply(solver)
+    if search_workers:
+        solver.parameters.num_search_workers = min(profile.workers, search_workers)
+    start = time.perf_counter()
+    status = cp_model.UNKNOWN
+    if not stop_requested():
+        with stop_on_request(solver):
+            status = solver.Solve(model)
+    solve_seconds = round(time.perf_counter() - start, 3)
+
+    chosen = []
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        chosen = [key for key, var in builder.assignments.items() if solver.Value(var) == 1]
+
+    required_slots = sum(required for required, *_ in shift_info.values())
+    filled = {}
+    hours = {}
+    for student_id, shift_id in chosen:
+        filled[shift_id] = filled.get(shift_id, 0) + 1
+        hours[student_id] = hours.get(student_id, 0) + shift_info[shift_id][1]
+    ranked = [builder.ranks[key] for key in chosen if builder.ranks[key]]
+
+    return {
+        "name": variant["name"],
+        "status": solver.StatusName(status),
+        "objective": solver.ObjectiveValue() if chosen else None,
+        "best_bound": solver.BestObjectiveBound() if chosen else None,
+        "filled_slots": len(chosen),
+        "required_slots": required_slots,
+        "coverage_percent": round(100 * len(chosen) / required_slots, 2) if required_slots else 0.0,
+        "understaffed_shifts": sum(
+            1 for shift_id, (required, *_) in shift_info.items() if filled.get(shift_id, 0) < required
+        ),
+        "students_assigned": len(hours),
+        "average_preference_rank": round(sum(ranked) / len(ranked), 2) if ranked else None,
+        "max_student_hours": round(max(hours.values()) / 100, 2) if hours else 0.0,
+        "build_ms": round(sum(builder.timings.values()), 2),
+        "solve_seconds": solve_seconds,
+        "chosen": chosen,
+    }
+
+
+class ScenarioRunner:
+    """
+    Solves a batch of variants; runs as a background job (see jobs.py), so
+    cancel() may be called from another thread. Cancelling stops the variant
+    searches in progress and drops queued ones.
+    """
+
+    def __init__(self, db: Session, semester: str, user_id: str, variants, persist_variant: str = None,
+                 progress=None):
+        self.optimizer = ScheduleOptimizer(db, semester, user_id, progress=progress)
+        self.semester = semester
+        self.variants = variants
+        self.persist_variant = persist_variant
+        self.pool = None
+        self.stop_event = None # Shared with the variant workers; set on cancel
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        if self.stop_event is not None:
+            self.stop_event.set()
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self):
+        """
+        Solve every variant against one load of the semester's data.
+        Returns {"semester", "results", "schedule"}; schedule is the draft saved
+        for persist_variant, or None. Returns None if cancelled.
+        """
+        optimizer = self.optimizer
+        optimizer.report("loading", 10)
+        shifts, student_ids, preferences, availability_entries = optimizer.load_data()
+        shift_info, student_limits = optimizer.model_inputs(shifts, preferences)
+        candidate_rows = optimizer.candidate_rows(shift_info, student_ids, availability_entries)
+        rows = optimizer.prune_rows(candidate_rows, shifts, preferences)
+        if self.cancelled:
+            return None
+
+        results = self.solve_variants(shift_info, student_limits, rows, student_ids)
+        if results is None:
+            return None
+
+        schedule = None
+        for result in results:
+            chosen = result.pop("chosen")
+            if result["name"] == self.persist_variant and result["objective"] is not None:
+                optimizer.report("saving", 90)
+                persisted = next(variant for variant in self.variants if variant["name"] == self.persist_variant)
+                optimizer.profile = get_profile(persisted.get("solver_profile") or "fast")
+                optimizer.objective_value = result["objective"]
+                optimizer.timings["solve"] = result["solve_seconds"]
+                # The variant's overrides, caps and weights reproduce the draft
+                optimizer.run_stats.update(
+                    status=result["status"], best_bound=result["best_bound"], variant=persisted,
+                    students=len(student_ids), shifts=len(shift_info), availability_rows=len(candidate_rows),
+                )
+                schedule = optimizer.save_solution(
+                    chosen, notes=f"Scenario '{self.persist_variant}'", version=SCENARIO_VERSION
+                )
+
+        return {"semester": self.semester, "results": results, "schedule": schedule}
+
+    def solve_variants(self, shift_info, student_limits, rows, student_ids):
+        """Result of each variant, in request order, or None if cancelled"""
+        workers = max(1, min(SCENARIO_WORKERS, len(self.variants)))
+        # Concurrent variants share the machine's cores
+        search_workers = max(1, (os.cpu_count() or 1) // workers)
+        print(f"Solving {len(self.variants)} scenario variants with {workers} workers")
+        self.optimizer.report("solving", 50)
+
+        context = multiprocessing.get_context("spawn")
+        self.stop_event = context.Event()
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=init_worker, initargs=(self.stop_event,)
+        )
+        if self.cancelled:
+            self.stop_event.set()
+        try:
+            futures = [
+                self.pool.submit(solve_variant, shift_info, student_limits, rows, student_ids, variant, search_workers)
+                for variant in self.variants
+            ]
+            results = [future.result() for future in futures]
+        except Exception:
+            if self.cancelled:
+                print("Scenarios cancelled.")
+                return None
+            raise
+        finally:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+            self.stop_event = None
+
+        if self.cancelled:
+            print("Scenarios cancelled.")
+            return None
+        return results
+
@@ -0,0 +1,63 @@
+"""
+Bulk persistence of solver output
+
+Assignments are written with a single COPY on PostgreSQL (psycopg 3) or one
+executemany INSERT elsewhere, inside the caller's transaction.
+"""
+
+import time
+import uuid
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .. import models
+
+ASSIGNMENT_COLUMNS = (
+    "id", "schedule_id", "shift_id", "user_id", "is_manual_override",
+    "assignment_score", "created_at", "updated_at",
+)
+
+
+def assignment_rows(schedule_id: str, chosen, ranks: dict):
+    """
+    Column tuples for the chosen (student_id, shift_id) pairs;
+    assignment_score is the student's preference rank for the shift
+    """
+    now = datetime.utcnow()
+    rows = []
+    for student_id, shift_id in chosen:
+        rank = ranks.get((student_id, shift_id))
+        rows.append((
+            str(uuid.uuid4()), schedule_id, shift_id, student_id, False,
+            float(rank) if rank else None, now, now,
+        ))
+    return rows
+
+
+def _copy_supported(db: Session) -> bool:
+    bind = db.get_bind()
+    return bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg"
+
+
+def write_assignments(db: Session, schedule_id: str, chosen, ranks: dict) -> dict:
+    """
+    Insert all assignments for a schedule in one statement (no commit).
+    Returns {"rows": count, "seconds": write duration}.
+    """
+    start = time.perf_counter()
+    rows = assignment_rows(schedule_id, chosen, ranks)
+
+    if rows and _copy_supported(db):
+        statement = f"COPY {models.ScheduleAssignment.__tablename__} ({', '.join(ASSIGNMENT_COLUMNS)}) FROM STDIN"
+        with db.connection().connection.cursor() as cursor:
+            with cursor.copy(statement) as copy:
+                for row in rows:
+                    copy.write_row(row)
+    elif rows:
+        db.execute(
+            insert(models.ScheduleAssignment.__table__),
+            [dict(zip(ASSIGNMENT_COLUMNS, row)) for row in rows]
+        )
+
+    return {"rows": len(rows), "seconds": round(time.perf_counter() - start, 4)}
@@ -0,0 +1,61 @@
+"""
+CP-SAT search profiles
+
+A profile fixes the search worker count, wall-clock budget, relative-gap
+stopping criterion and random seed. The deployment default comes from
+SCHEDULER_SOLVER_PROFILE; admins can pick another one per request.
+"""
+
+import os
+from dataclasses import dataclass
+from ortools.sat.python import cp_model
+
+# Model revision recorded in Schedule.algorithm_version as "<version>/<profile>"
+ALGORITHM_VERSION = "v2_flexible"
+
+# Cap on search workers for this deployment (0 = use every core)
+SEARCH_WORKERS = int(os.getenv("SCHEDULER_SEARCH_WORKERS", "0"))
+
+
+@dataclass(frozen=True)
+class SolverProfile:
+    name: str
+    num_workers: int  # 0 = all available cores
+    max_time_in_seconds: float
+    relative_gap_limit: float
+    random_seed: int = 0
+
+    @property
+    def workers(self) -> int:
+        """Worker count after applying the deployment cap"""
+        cores = os.cpu_count() or 1
+        workers = self.num_workers or cores
+        if SEARCH_WORKERS:
+            workers = min(workers, SEARCH_WORKERS)
+        return max(1, workers)
+
+    def apply(self, solver: cp_model.CpSolver):
+        solver.parameters.num_search_workers = self.workers
+        solver.parameters.max_time_in_seconds = self.max_time_in_seconds
+        solver.parameters.relative_gap_limit = self.relative_gap_limit
+        solver.parameters.random_seed = self.random_seed
+
+    def algorithm_version(self, version: str = ALGORITHM_VERSION) -> str:
+        return f"{version}/{self.name}"
+
+
+PROFILES = {
+    "fast": SolverProfile("fast", num_workers=4, max_time_in_seconds=10, relative_gap_limit=0.05),
+    "balanced": SolverProfile("balanced", num_workers=0, max_time_in_seconds=60, relative_gap_limit=0.01),
+    "thorough": SolverProfile("thorough", num_workers=0, max_time_in_seconds=600, relative_gap_limit=0.0),
+}
+
+DEFAULT_PROFILE = os.getenv("SCHEDULER_SOLVER_PROFILE", "balanced")
+
+
+def get_profile(name: str = None) -> SolverProfile:
+    """Resolve a profile by name, falling back to the deployment default"""
+    name = name or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown solver profile '{name}'. Choose one of: {', '.join(PROFILES)}")
+    return PROFILES[name]
@@ -0,0 +1,224 @@
+"""
+Symmetry reduction for interchangeable students
+
+Students with identical candidate shifts, ranks and caps are interchangeable:
+any permutation of their assignments scores the same, and CP-SAT would
+explore those permutations. They are grouped into equivalence classes, each
+modeled with one integer count per candidate shift, and the solved counts are
+expanded back into per-student assignments by round-robin.
+
+A class is only merged when its hours cap reduces to a shift-count cap (all
+candidate shifts have the same length, or the hours cap can never bind) and
+its day caps do too (a cap of one per day, or no overlapping candidate shifts
+on a day). The expansion then satisfies every student's caps exactly; other
+students stay in classes of one.
+"""
+
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from ortools.sat.python import cp_model
+
+from .model_builder import (
+    DEFAULT_WEIGHTS, DEFAULT_MAX_SHIFTS_PER_DAY, EXTRA_SHIFTS_ALLOWED, HOURS_OVERRUN_FACTOR,
+    overlap_cliques, preference_weight
+)
+
+# Aggregate automatically when it removes at least this share of the variables
+AGGREGATE_MIN_REDUCTION = float(os.getenv("SCHEDULER_AGGREGATE_MIN_REDUCTION", "0.3"))
+
+
+def shift_cap(limits, durations) -> int:
+    """
+    Per-student shift cap equivalent to the model's shift and hours caps,
+    or None if the hours cap cannot be expressed as a shift count
+    """
+    if not limits:
+        return len(durations)
+    max_shifts_per_week, desired_hours, _ = limits
+    cap = min(max_shifts_per_week + EXTRA_SHIFTS_ALLOWED, len(durations))
+    hours_limit = int(desired_hours * 100 * HOURS_OVERRUN_FACTOR)
+    longest = max(durations, default=0)
+    if cap * longest <= hours_limit:
+        return max(0, cap)  # Hours cap never binds
+    if min(durations) == longest:
+        return max(0, min(cap, hours_limit // longest))
+    return None
+
+
+def day_cap(limits) -> int:
+    return (limits[2] if limits else None) or DEFAULT_MAX_SHIFTS_PER_DAY
+
+
+def day_caps_exact(limits, shifts, shift_info: dict) -> bool:
+    """
+    Whether round-robin over the class's shifts in (day, start) order keeps
+    every member within their day cap and free of overlaps
+    """
+    if day_cap(limits) == 1:
+        return True
+    return not overlap_cliques({shift_id: shift_info[shift_id] for shift_id, _ in shifts})
+
+
+def equivalence_classes(rows, students, shift_info: dict, student_limits: dict):
+    """
+    Group candidate students by (candidate shifts with ranks, caps).
+    Returns [(student_ids, [(shift_id, rank)], shift_cap or None)], where a
+    cap of None marks a student that must be modeled individually.
+    """
+    students = set(students)
+    options = defaultdict(dict)
+    for student_id, shift_id, rank in rows:
+        if student_id in students and shift_id in shift_info:
+            options[student_id].setdefault(shift_id, rank)
+
+    groups = defaultdict(list)
+    for student_id, shifts in options.items():
+        signature = (tuple(sorted((shift_id, rank or 0) for shift_id, rank in shifts.items())),
+                     student_limits.get(student_id))
+        groups[signature].append(student_id)
+
+    classes = []
+    for (signature, limits), members in groups.items():
+        # Round-robin deals each day's shifts consecutively (see expand)
+        shifts = sorted(
+            ((shift_id, rank or None) for shift_id, rank in signature),
+            key=lambda option: shift_info[option[0]][2:4]
+        )
+        cap = shift_cap(limits, [shift_info[shift_id][1] for shift_id, _ in shifts])
+        exact = cap is not None and day_caps_exact(limits, shifts, shift_info)
+        if not exact and len(members) > 1:
+            classes.extend(([student_id], shifts, None) for student_id in members)
+        else:
+            classes.append((members, shifts, cap))
+    return classes
+
+
+def aggregated_size(classes) -> int:
+    """Count variables of the aggregated model (excluding fairness layers)"""
+    return sum(len(shifts) for _, shifts, _ in classes)
+
+
+class AggregateModelBuilder:
+    """
+    Assignment model over equivalence classes of students.
+
+    counts[(class_index, shift_id)] is the number of the class's students
+    assigned to the shift. Students of a class share the same caps, so the
+    class may take at most size x cap shifts in total, and size x day cap on
+    each day. Fairness is ModelBuilder's term, with per-class layers: the
+    k-th shift of each student costs the fairness weight k times, and the
+    layers fill in order because the cost is convex. Layer costs are those of
+    an even split of the class's shifts, which is what expand() deals, so the
+    optimum scores the same as that of the per-student model.
+    """
+
+    def __init__(self, model: cp_model.CpModel, shift_info: dict, student_limits: dict, weights: dict = None):
+        self.model = model
+        self.shift_info = shift_info
+        self.student_limits = student_limits
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.classes = []
+        self.counts = {}  # (class_index, shift_id) -> IntVar
+        self.by_shift = defaultdict(list)  # shift_id -> [IntVar]
+        self.timings = {}
+
+    @contextmanager
+    def timed(self, family: str):
+        start = time.perf_counter()
+        yield
+        self.timings[family] = round((time.perf_counter() - start) * 1000, 2)
+
+    def build(self, classes):
+        self.classes = classes
+        with self.timed("variables"):
+            for c, (members, shifts, _) in enumerate(classes):
+                for shift_id, _ in shifts:
+                    var = self.model.NewIntVar(0, len(members), f'count_{c}_{shift_id}')
+                    self.counts[(c, shift_id)] = var
+                    self.by_shift[shift_id].append(var)
+
+        # C1: Shift Coverage
+        with self.timed("coverage"):
+            for shift_id, (required_students, *_) in self.shift_info.items():
+                if self.by_shift.get(shift_id):
+                    self.model.Add(cp_model.LinearExpr.Sum(self.by_shift[shift_id]) <= required_students)
+
+        # C2: caps, and the objective with fairness layers
+        with self.timed("objective"):
+            variables, weights = [], []
+            for c, (members, shifts, cap) in enumerate(classes):
+                class_vars = [self.counts[(c, shift_id)] for shift_id, _ in shifts]
+                total = cp_model.LinearExpr.Sum(class_vars)
+                if cap is None:
+                    # A single student whose hours cap needs the exact durations
+                    max_shifts_per_week, desired_hours, _ = self.student_limits[members[0]]
+                    cap = min(max_shifts_per_week + EXTRA_SHIFTS_ALLOWED, len(shifts))
+                    durations = [self.shift_info[shift_id][1] for shift_id, _ in shifts]
+                    self.model.Add(cp_model.LinearExpr.WeightedSum(class_vars, durations)
+                                   <= int(desired_hours * 100 * HOURS_OVERRUN_FACTOR))
+                self.model.Add(total <= len(members) * cap)
+                self.add_day_limits(c, members, shifts, class_vars)
+
+                for (shift_id, rank), var in zip(shifts, class_vars):
+                    variables.append(var)
+                    weights.append(self.weights["fill"] + preference_weight(rank, self.weights))
+
+                layers = [self.model.NewIntVar(0, len(members), f'layer_{c}_{k}') for k in range(1, cap)]
+                if layers:
+                    # Shifts beyond each student's first fill layers 1, 2, ... in order
+                    first = self.model.NewIntVar(0, len(members), f'layer_{c}_0')
+                    self.model.Add(first + cp_model.LinearExpr.Sum(layers) == total)
+                    for k, layer in enumerate(layers, start=1):
+                        variables.append(layer)
+                        weights.append(self.weights["fairness"] * k)
+
+            self.model.Maximize(cp_model.LinearExpr.WeightedSum(variables, weights))
+        return self
+
+    def add_day_limits(self, c: int, members, shifts, class_vars):
+        # C3: per-day caps; only classes of one can have overlapping shifts
+        limits = self.student_limits.get(members[0])
+        by_day = defaultdict(list)
+        for (shift_id, _), var in zip(shifts, class_vars):
+            by_day[self.shift_info[shift_id][2]].append(var)
+        for day_vars in by_day.values():
+            if len(day_vars) > day_cap(limits):
+                self.model.Add(cp_model.LinearExpr.Sum(day_vars) <= len(members) * day_cap(limits))
+        if len(members) == 1 and day_cap(limits) > 1:
+            var_of = {shift_id: var for (shift_id, _), var in zip(shifts, class_vars)}
+            for day_cliques in overlap_cliques({shift_id: self.shift_info[shift_id] for shift_id in var_of}).values():
+                for clique in day_cliques:
+                    self.model.AddAtMostOne([var_of[shift_id] for shift_id in clique])
+
+    def add_hints(self, prior_assignments) -> int:
+        """Hint each count with the number of class members holding the shift before"""
+        with self.timed("hints"):
+            class_of = {student_id: c for c, (members, _, _) in enumerate(self.classes) for student_id in members}
+            prior = defaultdict(int)
+            kept = 0
+            for student_id, shift_id in set(prior_assignments):
+                key = (class_of.get(student_id), shift_id)
+                if key in self.counts:
+                    prior[key] += 1
+                    kept += 1
+            for key, var in self.counts.items():
+                self.model.AddHint(var, prior[key])
+        return kept
+
+    def expand(self, solver: cp_model.CpSolver):
+        """
+        Per-student (student_id, shift_id) pairs from solved counts: each
+        class deals its shifts to its members round-robin in (day, start)
+        order, so no student gets a shift twice and loads, overall and on
+        each day, differ by at most one shift
+        """
+        chosen = []
+        for c, (members, shifts, _) in enumerate(self.classes):
+            turn = 0
+            for shift_id, _ in shifts:
+                for _ in range(solver.Value(self.counts[(c, shift_id)])):
+                    chosen.append((members[turn % len(members)], shift_id))
+                    turn += 1
+        return chosen
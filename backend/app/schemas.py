@@ -4,7 +4,7 @@ These define the structure of data sent to/from the API
 """
 
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, time
 from uuid import UUID
 
@@ -40,6 +40,17 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserPage(BaseModel):
+    """One page of users; pass next_cursor back as cursor for the following page"""
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
+
+class CountResponse(BaseModel):
+    """Number of rows matching a list endpoint's filters"""
+    count: int
+
+
 # ============================================
 # SHIFT SCHEMAS
 # ============================================
@@ -166,7 +177,29 @@ class ScheduleBase(BaseModel):
 
 
 class ScheduleCreate(ScheduleBase):
-    pass
+    solver_profile: Optional[str] = Field(None, pattern="^(fast|balanced|thorough)$")
+    warm_start: bool = False  # Seed the solver with the latest draft's assignments
+    warm_start_schedule_id: Optional[UUID] = None  # ...or with a specific schedule's
+    decompose: Optional[bool] = None  # Solve independent components in parallel (default: large semesters)
+    force_refresh: bool = False  # Ignore cached results for identical inputs
+    objective_mode: str = Field("weighted", pattern="^(weighted|lexicographic)$")  # Weighted sum or phased solve
+    engine: str = Field("cpsat", pattern="^(cpsat|mcf|hybrid)$")  # mcf = min-cost flow; hybrid = CP-SAT hinted by it
+    aggregate: Optional[bool] = None  # Model interchangeable students as classes (default: when it shrinks the model)
+
+    def optimizer_options(self) -> dict:
+        """Optimizer keyword options set on this request (JSON-serializable)"""
+        return self.model_dump(mode="json", exclude={"semester", "notes"}, exclude_none=True)
+
+
+class ScheduleRepairRequest(BaseModel):
+    """Entities that changed since the base schedule was generated"""
+    shift_ids: List[UUID] = []
+    student_ids: List[UUID] = []
+    solver_profile: Optional[str] = Field("fast", pattern="^(fast|balanced|thorough)$")
+
+    def repair_options(self, base_schedule_id: str) -> dict:
+        """Job options (JSON-serializable) for repairing base_schedule_id"""
+        return {"base_schedule_id": base_schedule_id, **self.model_dump(mode="json", exclude_none=True)}
 
 
 class ScheduleUpdate(BaseModel):
@@ -188,6 +221,12 @@ class ScheduleResponse(ScheduleBase):
         from_attributes = True
 
 
+class SchedulePage(BaseModel):
+    """One page of schedules; pass next_cursor back as cursor for the following page"""
+    items: List[ScheduleResponse]
+    next_cursor: Optional[str] = None
+
+
 class ScheduleWithStats(ScheduleResponse):
     """Schedule with summary statistics"""
     total_assignments: int
@@ -196,6 +235,163 @@ class ScheduleWithStats(ScheduleResponse):
     conflicts_count: int
 
 
+# ============================================
+# WHAT-IF SCENARIO SCHEMAS
+# ============================================
+
+class ScenarioWeights(BaseModel):
+    """Objective weight overrides (unset = optimizer default)"""
+    fill: Optional[int] = None
+    rank: Optional[int] = None
+    neutral_preference: Optional[int] = None
+    fairness: Optional[int] = None
+
+
+class ScenarioVariant(BaseModel):
+    """One parameter variant to solve against the semester's data"""
+    name: str = Field(..., min_length=1, max_length=50)
+    required_students: Dict[UUID, int] = {}  # shift_id -> required_students override
+    max_shifts_per_week: Optional[int] = Field(None, ge=0)  # Hard cap on every student; never loosens their own
+    max_hours_per_week: Optional[float] = Field(None, ge=0)
+    weights: Optional[ScenarioWeights] = None
+    solver_profile: Optional[str] = Field("fast", pattern="^(fast|balanced|thorough)$")
+
+
+class ScenarioRequest(BaseModel):
+    semester: str = Field(..., min_length=1, max_length=50)
+    variants: List[ScenarioVariant] = Field(..., min_length=1, max_length=10)
+    persist_variant: Optional[str] = None  # Save this variant's roster as a draft
+
+    def scenario_options(self) -> dict:
+        """Job options (JSON-serializable): the variants and persist_variant"""
+        return self.model_dump(mode="json", exclude={"semester"}, exclude_none=True)
+
+
+class ScenarioResult(BaseModel):
+    """Comparative metrics for one solved variant"""
+    name: str
+    status: str
+    objective: Optional[float]
+    best_bound: Optional[float]
+    filled_slots: int
+    required_slots: int
+    coverage_percent: float
+    understaffed_shifts: int
+    students_assigned: int
+    average_preference_rank: Optional[float]
+    max_student_hours: float
+    build_ms: float
+    solve_seconds: float
+
+
+class ScenarioComparison(BaseModel):
+    """Result of a scenario job; the draft saved for persist_variant is the job's schedule_id"""
+    results: List[ScenarioResult]
+
+
+# ============================================
+# PRE-SOLVE DIAGNOSTICS SCHEMAS
+# ============================================
+
+class ShiftShortfall(BaseModel):
+    """Shift with fewer available students than required"""
+    shift_id: UUID
+    day_name: str
+    start_time: str
+    end_time: str
+    candidates: int
+    required_students: int
+    shortfall: int
+
+
+class DayCapacity(BaseModel):
+    """Required slots vs. student capacity (under daily caps) for one day"""
+    day_of_week: int
+    day_name: str
+    demand: int
+    supply: int
+    shortfall: int
+
+
+class UnmetDesiredHours(BaseModel):
+    """Student whose desired hours exceed all shifts they are available for"""
+    user_id: UUID
+    desired_hours_per_week: float
+    available_hours: float
+
+
+class ScheduleDiagnostics(BaseModel):
+    """Pre-solve feasibility report for a semester"""
+    feasible: bool
+    errors: List[str]
+    warnings: List[str]
+    total_students: int
+    total_shifts: int
+    available_pairs: int
+    required_slots: int
+    understaffed_shifts: List[ShiftShortfall]
+    day_capacity: List[DayCapacity]
+    unmet_desired_hours: List[UnmetDesiredHours]
+
+
+# ============================================
+# SCHEDULE JOB SCHEMAS
+# ============================================
+
+class ScheduleJobResponse(BaseModel):
+    """Status of a background solver job"""
+    id: UUID
+    kind: str = "generate"
+    semester: str
+    status: str
+    stage: Optional[str]
+    progress: int
+    cancel_requested: bool
+    options: Optional[dict]
+    schedule_id: Optional[UUID]
+    result: Optional[ScenarioComparison] = None  # Scenario jobs only
+    requested_by: Optional[UUID]
+    error: Optional[str]
+    error_code: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+# ============================================
+# SOLVER TELEMETRY SCHEMAS
+# ============================================
+
+class SolverRunResponse(BaseModel):
+    """Timings, model size and solver outcome for one generated schedule"""
+    id: UUID
+    schedule_id: UUID
+    semester: str
+    algorithm_version: Optional[str]
+    status: Optional[str]
+    objective: Optional[float]
+    best_bound: Optional[float]
+    gap: Optional[float]
+    students: Optional[int]
+    shifts: Optional[int]
+    availability_rows: Optional[int]
+    variables: Optional[int]
+    constraints: Optional[int]
+    load_seconds: Optional[float]
+    build_seconds: Optional[float]
+    solve_seconds: Optional[float]
+    save_seconds: Optional[float]
+    build_timings: Optional[dict]
+    parameters: Optional[dict]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 # ============================================
 # SCHEDULE ASSIGNMENT SCHEMAS
 # ============================================
@@ -236,6 +432,13 @@ class ScheduleAssignmentDetailed(ScheduleAssignmentResponse):
     user: UserResponse
 
 
+class ScheduleAssignmentsCompact(BaseModel):
+    """Assignments with each referenced shift and user listed once"""
+    assignments: List[ScheduleAssignmentResponse]
+    shifts: List[ShiftResponse]
+    users: List[UserResponse]
+
+
 # ============================================
 # SCHEDULE CONFLICT SCHEMAS
 # ============================================
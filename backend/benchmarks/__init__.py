@@ -0,0 +1,11 @@
+"""
+Solver scaling benchmarks
+
+Usage (from the backend directory):
+    python -m benchmarks.run --sizes 100,500,2000 --output benchmarks/results.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+Each size is generated and solved in its own child process against a fresh
+SQLite database, so peak RSS is measured per size and nothing touches the
+application database.
+"""
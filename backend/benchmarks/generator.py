@@ -0,0 +1,113 @@
+"""
+Seeded synthetic scheduling instances
+
+generate() builds plain rows for students, shifts, semester preferences and
+availability; the same (size, density, seed) always yields the same
+instance. populate() bulk-inserts an instance into a database.
+"""
+
+import random
+import uuid
+from datetime import time
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+SEMESTER = "Benchmark"
+SHIFT_HOURS = 4
+# Shifts start between these hours, spread evenly over the day
+FIRST_START_HOUR = 7
+LAST_START_HOUR = 19
+AVERAGE_SHIFTS_PER_STUDENT = 3
+
+
+def shift_start_hours(shifts_per_day: int):
+    if shifts_per_day == 1:
+        return [FIRST_START_HOUR]
+    step = (LAST_START_HOUR - FIRST_START_HOUR) / (shifts_per_day - 1)
+    return [FIRST_START_HOUR + round(k * step) for k in range(shifts_per_day)]
+
+
+def generate(students: int, shifts_per_day: int = 4, density: float = 0.4, demand: float = 0.8,
+             seed: int = 0) -> dict:
+    """
+    Synthetic instance as lists of column dicts keyed by table;
+    users[0] is an admin to attribute generated schedules to.
+
+    density: probability that a student is available for a given shift
+    demand:  required slots as a fraction of the students' typical weekly
+             capacity (AVERAGE_SHIFTS_PER_STUDENT each), so staffing needs
+             grow with the workforce
+    """
+    rnd = random.Random(seed)
+    # Ids come from the seeded generator too, so instances are reproducible
+    new_id = lambda: str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+    required_mean = students * AVERAGE_SHIFTS_PER_STUDENT * demand / (7 * shifts_per_day)
+    shifts = []
+    for day in range(7):
+        for hour in shift_start_hours(shifts_per_day):
+            shifts.append({
+                "id": new_id(),
+                "day_of_week": day,
+                "start_time": time(hour),
+                "end_time": time(hour + SHIFT_HOURS),
+                "shift_type": "weekend" if day >= 5 else "weekday",
+                "required_students": max(1, round(required_mean * rnd.uniform(0.5, 1.5))),
+                "is_active": True,
+            })
+
+    users = [{
+        "id": new_id(),
+        "email": "bench.admin@example.com",
+        "full_name": "Bench Admin",
+        "role": "admin",
+        "is_active": True,
+        "hashed_password": "!",  # Not a valid hash; benchmark users cannot log in
+    }]
+    preferences, availability = [], []
+    for i in range(students):
+        user_id = new_id()
+        users.append({
+            "id": user_id,
+            "email": f"bench.student{i}@example.com",
+            "full_name": f"Bench Student {i}",
+            "role": "student",
+            "is_active": True,
+            "hashed_password": "!",
+        })
+        can_work_weekends = rnd.random() < 0.5
+        preferences.append({
+            "id": new_id(),
+            "user_id": user_id,
+            "semester": SEMESTER,
+            "max_shifts_per_week": rnd.choice([2, 3, 4, 5]),
+            "max_shifts_per_day": 1,
+            "desired_hours_per_week": rnd.choice([8, 12, 16, 20]),
+            "can_work_weekends": can_work_weekends,
+        })
+        for shift in shifts:
+            if shift["shift_type"] == "weekend" and not can_work_weekends:
+                continue
+            if rnd.random() < density:
+                availability.append({
+                    "id": new_id(),
+                    "user_id": user_id,
+                    "shift_id": shift["id"],
+                    "semester": SEMESTER,
+                    "is_available": True,
+                    "preference_rank": rnd.choice([None, 1, 2, 3, 4, 5]),
+                })
+
+    return {"shifts": shifts, "users": users, "preferences": preferences, "availability": availability}
+
+
+def populate(db: Session, instance: dict):
+    """Insert an instance with one executemany per table"""
+    db.execute(insert(models.Shift.__table__), instance["shifts"])
+    db.execute(insert(models.User.__table__), instance["users"])
+    db.execute(insert(models.StudentPreference.__table__), instance["preferences"])
+    if instance["availability"]:
+        db.execute(insert(models.Availability.__table__), instance["availability"])
+    db.commit()
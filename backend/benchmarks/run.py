@@ -0,0 +1,207 @@
+"""
+Benchmark runner
+
+For each size a child process generates a seeded instance into a fresh
+SQLite database, runs the ScheduleOptimizer stages and reports timings,
+model size, objective, gap and its own peak RSS. The parent collects the
+results into a JSON file and can compare them against a baseline file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = "100,500,2000"
+# Relative slowdown (or objective drop) tolerated before --compare fails
+DEFAULT_TOLERANCE = 0.25
+# Below this many seconds, timing differences are noise
+MIN_COMPARED_SECONDS = 0.05
+
+
+def peak_rss_mb() -> float:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_size(config: dict) -> dict:
+    """Child process: generate, load, build, solve and save one instance"""
+    from app import database, models
+    from app.scheduler.optimizer import ScheduleOptimizer
+    from benchmarks import generator
+
+    tables = [table for name, table in models.Base.metadata.tables.items() if name != "audit_log"]
+    models.Base.metadata.create_all(database.engine, tables=tables)
+
+    start = time.perf_counter()
+    instance = generator.generate(
+        config["students"], config["shifts_per_day"], config["density"], config["demand"], config["seed"]
+    )
+    db = database.SessionLocal()
+    generator.populate(db, instance)
+    generate_seconds = time.perf_counter() - start
+
+    optimizer = ScheduleOptimizer(
+        db, generator.SEMESTER, instance["users"][0]["id"],
+        solver_profile=config["profile"], decompose=False, force_refresh=True
+    )
+    start = time.perf_counter()
+    shifts, student_ids, preferences, availability_entries = optimizer.load_data()
+    shift_info, student_limits = optimizer.model_inputs(shifts, preferences)
+    candidate_rows = optimizer.candidate_rows(shift_info, student_ids, availability_entries)
+    rows = optimizer.prune_rows(candidate_rows, shifts, preferences)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    optimizer.build_model(shift_info, student_limits, rows, student_ids)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    solved = optimizer.solve()
+    solve_seconds = time.perf_counter() - start
+
+    objective = best_bound = gap = None
+    save_seconds = None
+    if solved:
+        objective = optimizer.objective_value
+        best_bound = optimizer.solver.BestObjectiveBound()
+        gap = abs(best_bound - objective) / max(1.0, abs(best_bound))
+        start = time.perf_counter()
+        optimizer.save_solution(optimizer.chosen_assignments())
+        save_seconds = time.perf_counter() - start
+
+    return {
+        "students": config["students"],
+        "shifts": len(shift_info),
+        "availability_rows": len(candidate_rows),
+        "pruned_rows": len(candidate_rows) - len(rows),
+        "required_slots": sum(required for required, *_ in shift_info.values()),
+        "variables": len(optimizer.assignments),
+        "status": optimizer.solver.StatusName(),
+        "objective": objective,
+        "best_bound": best_bound,
+        "gap": round(gap, 6) if gap is not None else None,
+        "assignments": optimizer.write_stats.get("rows", 0),
+        "generate_seconds": round(generate_seconds, 3),
+        "load_seconds": round(load_seconds, 3),
+        "build_seconds": round(build_seconds, 3),
+        "build_timings_ms": optimizer.build_timings,
+        "solve_seconds": round(solve_seconds, 3),
+        "save_seconds": round(save_seconds, 3) if save_seconds is not None else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def spawn_size(config: dict, workdir: str) -> dict:
+    """Run one size in a child process so peak RSS is measured per size"""
+    env = dict(os.environ)
+    database_path = os.path.join(workdir, f"bench_{config['students']}.db")
+    env["DATABASE_URL"] = f"sqlite:///{database_path}"
+    env["SCHEDULER_CACHE_MAX_BYTES"] = "0"
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--child", json.dumps(config)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines() or [f"exit code {completed.returncode}"]
+        return {"students": config["students"], "error": lines[-1]}
+    # The optimizer prints progress; the result is the last stdout line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance: float):
+    """Regressions of the current results against a baseline results file"""
+    previous = {entry["students"]: entry for entry in baseline["results"] if "error" not in entry}
+    regressions = []
+    for entry in results:
+        before = previous.get(entry["students"])
+        if not before or "error" in entry:
+            continue
+        for metric in ("build_seconds", "solve_seconds", "peak_rss_mb"):
+            old, new = before.get(metric), entry.get(metric)
+            if old is None or new is None:
+                continue
+            if metric.endswith("_seconds") and max(old, new) < MIN_COMPARED_SECONDS:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(f"{entry['students']} students: {metric} {old} -> {new}")
+        old, new = before.get("objective"), entry.get("objective")
+        if old and (new is None or new < old * (1 - tolerance)):
+            regressions.append(f"{entry['students']} students: objective {old} -> {new}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ScheduleOptimizer scaling on synthetic instances")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated student counts")
+    parser.add_argument("--shifts-per-day", type=int, default=4)
+    parser.add_argument("--density", type=float, default=0.4, help="probability a student is available for a shift")
+    parser.add_argument("--demand", type=float, default=0.8, help="required slots relative to student capacity")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", default="fast", choices=["fast", "balanced", "thorough"])
+    parser.add_argument("--output", default=os.path.join(BACKEND_DIR, "benchmarks", "results.json"))
+    parser.add_argument("--compare", help="baseline results file; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_size(json.loads(args.child))))
+        return
+
+    from ortools import __version__ as ortools_version
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="workforce-bench-") as workdir:
+        for students in (int(size) for size in args.sizes.split(",")):
+            config = {
+                "students": students, "shifts_per_day": args.shifts_per_day, "density": args.density,
+                "demand": args.demand, "seed": args.seed, "profile": args.profile,
+            }
+            result = spawn_size(config, workdir)
+            results.append(result)
+            if "error" in result:
+                print(f"{students:>6} students: failed {result['error']}")
+            else:
+                print(f"{students:>6} students: {result['variables']} vars, build {result['build_seconds']}s, "
+                      f"solve {result['solve_seconds']}s ({result['status']}, gap {result['gap']}), "
+                      f"peak RSS {result['peak_rss_mb']} MB")
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "ortools": ortools_version,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "shifts_per_day": args.shifts_per_day, "density": args.density, "demand": args.demand,
+            "seed": args.seed, "profile": args.profile,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
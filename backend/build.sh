@@ -4,3 +4,6 @@ set -o errexit
 
 pip install --upgrade pip
 pip install -r requirements.txt
+
+# Create new tables and apply schema upgrades (idempotent)
+python init_render_db.py --schema-only
@@ -10,11 +10,55 @@ import sys
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.database import init_db, SessionLocal
+from sqlalchemy import text
+
+from app.database import init_db, engine, SessionLocal
 from app.models import User, Shift
 from app.auth import get_password_hash
 from datetime import datetime, time
 
+# create_all only creates missing tables; changes to existing tables are
+# applied here. Every step is idempotent, so this runs on each deploy.
+DEDUPE_AVAILABILITY = """
+DELETE FROM availability WHERE id IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY user_id, shift_id, semester
+            ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id DESC
+        ) AS duplicate
+        FROM availability
+    ) ranked
+    WHERE duplicate > 1
+)
+"""
+# Conflict target of the bulk availability upsert. A unique index serves
+# ON CONFLICT like the constraint does, and skips cleanly if the constraint
+# (whose index has the same name) already exists.
+AVAILABILITY_UNIQUE_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS uq_availability_user_shift_semester
+ON availability (user_id, shift_id, semester)
+"""
+
+# Indexes added to existing tables (keyset pagination order)
+ADDED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_schedules_created_at_id ON schedules (created_at, id)",
+]
+
+
+def upgrade_schema():
+    """Bring tables created by an older release up to the current models"""
+    with engine.begin() as connection:
+        # Keep the most recently updated row of each (student, shift, semester)
+        removed = connection.execute(text(DEDUPE_AVAILABILITY)).rowcount
+        if removed:
+            print(f"🧹 Removed {removed} duplicate availability rows")
+        connection.execute(text(AVAILABILITY_UNIQUE_INDEX))
+        for statement in ADDED_INDEXES:
+            connection.execute(text(statement))
+    print("✅ Schema is up to date")
+
+
 def seed_database():
     """Seed database with initial test data"""
     db = SessionLocal()
@@ -104,9 +148,11 @@ if __name__ == "__main__":
     # Initialize database tables
     print("\n📦 Creating database tables...")
     init_db()
+    upgrade_schema()
     
-    # Seed with test data
-    seed_database()
+    # Seed with test data (build.sh passes --schema-only: tables only)
+    if "--schema-only" not in sys.argv:
+        seed_database()
     
     print("\n" + "=" * 60)
     print("✅ Setup complete! Your database is ready to use.")
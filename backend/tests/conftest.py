@@ -0,0 +1,32 @@
+"""
+Test setup: a throwaway SQLite database, configured before the app is imported
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="workforce-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["SCHEDULER_CACHE_MAX_BYTES"] = "0"
+
+from app import database, models  # noqa: E402
+
+# audit_log uses PostgreSQL-only column types
+TABLES = [table for name, table in models.Base.metadata.tables.items() if name != "audit_log"]
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(database.engine, tables=TABLES)
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(database.engine, tables=TABLES)
@@ -0,0 +1,44 @@
+import uuid
+
+from app import models
+from app.routers.availability import create_bulk_availability
+from app.schemas import AvailabilityBulkCreate
+from benchmarks import generator
+
+SEMESTER = "Spring 2025"
+
+
+def submit(db, user, entries):
+    return create_bulk_availability(AvailabilityBulkCreate(semester=SEMESTER, availabilities=entries), user, db)
+
+
+def test_bulk_availability_upserts_and_counts_created_and_updated(db):
+    instance = generator.generate(1)
+    instance["availability"] = []
+    generator.populate(db, instance)
+    student = db.query(models.User).filter(models.User.role == "student").one()
+    first, second, third = [shift["id"] for shift in instance["shifts"][:3]]
+    missing = str(uuid.uuid4())
+
+    response = submit(db, student, [
+        {"shift_id": first, "preference_rank": 2},
+        {"shift_id": second, "preference_rank": 5},
+        {"shift_id": second, "preference_rank": 1},  # Last entry for a shift wins
+        {"shift_id": missing},
+        {"shift_id": third, "preference_rank": 9},
+    ])
+    assert (response["created"], response["updated"]) == (2, 0)
+    assert len(response["errors"]) == 2  # Unknown shift and out-of-range rank
+
+    response = submit(db, student, [
+        {"shift_id": first, "is_available": False},
+        {"shift_id": third, "preference_rank": 3},
+    ])
+    assert (response["created"], response["updated"], response["errors"]) == (1, 1, [])
+
+    db.expire_all()
+    rows = {
+        row.shift_id: (row.is_available, row.preference_rank)
+        for row in db.query(models.Availability).filter_by(user_id=student.id, semester=SEMESTER)
+    }
+    assert rows == {first: (False, None), second: (True, 1), third: (True, 3)}
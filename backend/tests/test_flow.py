@@ -0,0 +1,49 @@
+from app.scheduler.flow import solve_min_cost_flow, student_capacity, day_capacity
+from app.scheduler.model_builder import fixed_objective
+
+# shift_id -> (required_students, centi-hours, day_of_week, start minute, end minute)
+SHIFT_INFO = {
+    "mon-am": (2, 400, 0, 480, 720), "mon-pm": (1, 400, 0, 720, 960),
+    "tue-am": (2, 400, 1, 480, 720), "wed-am": (1, 400, 2, 480, 720),
+}
+
+
+def test_student_capacity_applies_shift_and_hours_caps():
+    assert student_capacity(None, [400, 400, 400]) == 3
+    # Shift cap with slack: 1 + 2
+    assert student_capacity((1, 40, 1), [400] * 5) == 3
+    # 4 desired hours x 1.5 fits one 4-hour shift
+    assert student_capacity((5, 4, 1), [400] * 5) == 1
+    # Shifts and hours already held count against the caps
+    assert student_capacity((2, 40, 1), [400] * 5, fixed_load=(3, 1200, {})) == 1
+
+
+def test_day_capacity_is_one_when_candidate_windows_overlap():
+    assert day_capacity((3, 20, 2), [(480, 720), (720, 960)]) == 2
+    assert day_capacity((3, 20, 2), [(480, 720), (600, 840)]) == 1
+    assert day_capacity(None, [(480, 720), (720, 960)]) == 1  # Default per-day cap
+    assert day_capacity((3, 20, 2), [(480, 720), (720, 960)], fixed_shifts=2) == 0
+
+
+def test_flow_respects_caps_and_scores_like_the_model():
+    student_limits = {"a": (1, 8, 1), "b": (0, 4, 1), "c": (3, 20, 2)}
+    ranks = {
+        ("a", "mon-am"): 1, ("a", "tue-am"): 2, ("a", "wed-am"): None,
+        ("b", "mon-am"): 3, ("b", "mon-pm"): 1,
+        ("c", "mon-am"): None, ("c", "mon-pm"): 2, ("c", "tue-am"): 5, ("c", "wed-am"): 1,
+    }
+    rows = [(student_id, shift_id, rank) for (student_id, shift_id), rank in ranks.items()]
+
+    result = solve_min_cost_flow(SHIFT_INFO, student_limits, rows)
+
+    assert result["status"] == "OPTIMAL"
+    chosen = result["chosen"]
+    assert len(set(chosen)) == len(chosen) and set(chosen) <= set(ranks)
+    for shift_id, (required, *_) in SHIFT_INFO.items():
+        assert sum(1 for _, s in chosen if s == shift_id) <= required
+    load = {student_id: [SHIFT_INFO[s][2] for st, s in chosen if st == student_id] for student_id in student_limits}
+    assert len(load["a"]) <= 2  # Hours cap: 8 x 1.5 = 12 hours
+    assert len(load["b"]) <= 1
+    for student_id, days in load.items():
+        assert all(days.count(day) <= student_limits[student_id][2] for day in days)
+    assert result["objective"] == fixed_objective(chosen, ranks)
@@ -0,0 +1,230 @@
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app import models
+from app.scheduler import jobs, optimizer
+from benchmarks import generator
+
+# Far more than the search needs to notice a stop, far less than the thorough profile's budget
+CANCEL_DEADLINE_SECONDS = 20
+
+
+def populate_components(db, students: int, components: int = 2):
+    """Disjoint generator instances in one semester, i.e. independent components"""
+    for k in range(components):
+        instance = generator.generate(students, seed=k)
+        for user in instance["users"]:
+            user["email"] = f"{k}.{user['email']}"
+        generator.populate(db, instance)
+    return instance["users"][0]["id"]
+
+
+def wait_for_job(db, job_id: str, predicate, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        db.expire_all()
+        job = db.get(models.ScheduleJob, job_id)
+        if predicate(job):
+            return job
+        time.sleep(0.2)
+    return None
+
+
+def test_cancel_stops_running_component_solves(db, monkeypatch):
+    monkeypatch.setattr(optimizer, "COMPONENT_WORKERS", 2)
+    admin_id = populate_components(db, students=300)
+    options = {"solver_profile": "thorough", "decompose": True, "force_refresh": True}
+    job = models.ScheduleJob(semester=generator.SEMESTER, status="queued", options=options, requested_by=admin_id)
+    db.add(job)
+    db.commit()
+
+    runner = threading.Thread(
+        target=jobs.run_generation_job, args=(job.id, job.semester, admin_id, options), daemon=True
+    )
+    runner.start()
+    assert wait_for_job(db, job.id, lambda j: j.stage == "solving", timeout=60)
+
+    job = db.get(models.ScheduleJob, job.id)
+    job.cancel_requested = True
+    db.commit()
+    cancelled_at = time.monotonic()
+
+    job = wait_for_job(db, job.id, lambda j: j.status not in jobs.ACTIVE_STATUSES, CANCEL_DEADLINE_SECONDS)
+    assert job is not None, "job still active after cancellation"
+    assert job.status == "cancelled"
+    assert job.schedule_id is None
+    runner.join(timeout=5)
+    assert time.monotonic() - cancelled_at < CANCEL_DEADLINE_SECONDS
+
+
+def test_scenario_job_records_results_and_respects_variant_caps(db):
+    instance = generator.generate(40, demand=1.2)
+    generator.populate(db, instance)
+    admin_id = instance["users"][0]["id"]
+    options = {
+        "variants": [{"name": "base", "solver_profile": "fast"},
+                     {"name": "one_shift", "max_shifts_per_week": 1, "solver_profile": "fast"}],
+        "persist_variant": "one_shift",
+    }
+    job, created = jobs.find_or_create_generation_job(
+        db, generator.SEMESTER, options, admin_id, kind=jobs.KIND_SCENARIOS
+    )
+    assert created
+
+    schedule_id = jobs.run_generation_job(job.id, job.semester, admin_id, options)
+
+    db.expire_all()
+    job = db.get(models.ScheduleJob, job.id)
+    assert job.status == "completed"
+    assert job.schedule_id == schedule_id
+    results = {result["name"]: result for result in job.result["results"]}
+    assert set(results) == {"base", "one_shift"}
+    assert results["one_shift"]["filled_slots"] < results["base"]["filled_slots"]
+
+    # The draft records the variant it was solved under
+    draft = db.get(models.Schedule, schedule_id)
+    assert draft.algorithm_version == f"{optimizer.SCENARIO_VERSION}/fast"
+    assert draft.solver_run.parameters["variant"] == options["variants"][1]
+
+    per_student = {}
+    for assignment in db.query(models.ScheduleAssignment).filter_by(schedule_id=schedule_id):
+        per_student[assignment.user_id] = per_student.get(assignment.user_id, 0) + 1
+    assert per_student and max(per_student.values()) == 1
+
+
+def test_repair_job_scores_the_whole_schedule(db):
+    instance = generator.generate(40)
+    generator.populate(db, instance)
+    admin_id = instance["users"][0]["id"]
+    base = optimizer.ScheduleOptimizer(
+        db, generator.SEMESTER, admin_id, solver_profile="fast", decompose=False, aggregate=False
+    ).generate()
+    changed_shift = instance["shifts"][0]["id"]
+
+    options = {"base_schedule_id": base.id, "shift_ids": [changed_shift], "student_ids": [], "solver_profile": "fast"}
+    job, _ = jobs.find_or_create_generation_job(db, base.semester, options, admin_id, kind=jobs.KIND_REPAIR)
+    schedule_id = jobs.run_generation_job(job.id, job.semester, admin_id, options)
+
+    db.expire_all()
+    job = db.get(models.ScheduleJob, job.id)
+    assert job.status == "completed" and job.schedule_id == schedule_id
+    repaired = db.get(models.Schedule, schedule_id)
+    assert repaired.algorithm_version.startswith(optimizer.REPAIR_VERSION)
+
+    ranks = {
+        (row.user_id, row.shift_id): row.preference_rank
+        for row in db.query(models.Availability).filter_by(semester=generator.SEMESTER)
+    }
+    # Only the changed shift is re-solved
+    kept = [(a.user_id, a.shift_id) for a in base.assignments if a.shift_id != changed_shift]
+    neighbourhood = repaired.solver_run.parameters["neighbourhood_objective"]
+    assert float(repaired.optimization_score) == neighbourhood + optimizer.fixed_objective(kept, ranks)
+    assert float(repaired.optimization_score) > neighbourhood
+
+
+def test_repair_job_fails_when_its_base_schedule_was_deleted(db):
+    instance = generator.generate(20)
+    generator.populate(db, instance)
+    admin_id = instance["users"][0]["id"]
+    base = optimizer.ScheduleOptimizer(db, generator.SEMESTER, admin_id, solver_profile="fast").generate()
+    options = {"base_schedule_id": base.id, "shift_ids": [instance["shifts"][0]["id"]], "student_ids": []}
+    job, _ = jobs.find_or_create_generation_job(db, base.semester, options, admin_id, kind=jobs.KIND_REPAIR)
+    db.delete(base)
+    db.commit()
+
+    assert jobs.run_generation_job(job.id, job.semester, admin_id, options) is None
+
+    db.expire_all()
+    job = db.get(models.ScheduleJob, job.id)
+    assert job.status == "failed" and job.error_code == jobs.ERROR_REJECTED
+    assert "no longer exists" in job.error
+    assert db.query(models.Schedule).count() == 0
+
+
+def test_generation_is_rejected_when_pruning_leaves_no_candidates(db):
+    instance = generator.generate(20)
+    for shift in instance["shifts"]:
+        shift["shift_type"] = "rotating"  # No generated student opts into rotating shifts
+    generator.populate(db, instance)
+    admin_id = instance["users"][0]["id"]
+    options = {"solver_profile": "fast"}
+    job, _ = jobs.find_or_create_generation_job(db, generator.SEMESTER, options, admin_id)
+
+    assert jobs.run_generation_job(job.id, job.semester, admin_id, options) is None
+
+    db.expire_all()
+    job = db.get(models.ScheduleJob, job.id)
+    assert job.status == "failed"
+    assert job.error_code == jobs.ERROR_REJECTED
+    assert db.query(models.Schedule).count() == 0
+
+
+def test_cancel_during_save_keeps_the_saved_schedule(db, monkeypatch):
+    instance = generator.generate(20)
+    generator.populate(db, instance)
+    admin_id = instance["users"][0]["id"]
+    save_solution = optimizer.ScheduleOptimizer.save_solution
+
+    def cancelled_while_saving(self, *args, **kwargs):
+        self.cancel()
+        return save_solution(self, *args, **kwargs)
+
+    monkeypatch.setattr(optimizer.ScheduleOptimizer, "save_solution", cancelled_while_saving)
+    options = {"solver_profile": "fast"}
+    job, _ = jobs.find_or_create_generation_job(db, generator.SEMESTER, options, admin_id)
+
+    schedule_id = jobs.run_generation_job(job.id, job.semester, admin_id, options)
+
+    db.expire_all()
+    job = db.get(models.ScheduleJob, job.id)
+    assert schedule_id is not None
+    assert job.status == "completed" and job.schedule_id == schedule_id
+
+
+def test_abandoned_jobs_are_failed_and_never_attached_to(db):
+    instance = generator.generate(5)
+    generator.populate(db, instance)
+    admin_id = instance["users"][0]["id"]
+    options = {"solver_profile": "fast"}
+    stale = datetime.utcnow() - timedelta(seconds=jobs.JOB_LEASE_SECONDS + 60)
+    orphan = models.ScheduleJob(
+        semester=generator.SEMESTER, status="running", options=options, requested_by=admin_id,
+        created_at=stale, heartbeat_at=stale
+    )
+    live = models.ScheduleJob(
+        semester="Other", status="queued", options=options, requested_by=admin_id, heartbeat_at=datetime.utcnow()
+    )
+    db.add_all([orphan, live])
+    db.commit()
+
+    job, created = jobs.find_or_create_generation_job(db, generator.SEMESTER, options, admin_id)
+    assert created and job.id != orphan.id
+
+    db.expire_all()
+    assert orphan.status == "failed" and orphan.error_code == jobs.ERROR_ABANDONED
+    assert live.status == "queued"
+    assert jobs.recover_abandoned_jobs() == 0
+
+
+def test_abnormal_exit_near_the_memory_limit_is_a_memory_failure(monkeypatch):
+    monkeypatch.setattr(jobs, "MEMORY_LIMIT_MB", 1000)
+    # OpenBLAS exits with status 1 when an allocation fails
+    assert jobs.describe_exit(1, peak_resident=950)[0] == jobs.ERROR_MEMORY_LIMIT
+    assert jobs.describe_exit(1, peak_virtual=3900)[0] == jobs.ERROR_MEMORY_LIMIT
+    assert jobs.describe_exit(1, peak_resident=200, peak_virtual=800)[0] == jobs.ERROR_SOLVER_CRASHED
+
+
+def test_job_cpu_seconds_counts_child_processes():
+    before = jobs.job_cpu_seconds()
+    child = subprocess.Popen([sys.executable, "-c", "while True: pass"])
+    try:
+        time.sleep(1.5)
+        assert jobs.job_cpu_seconds() - before >= 0.5
+    finally:
+        child.kill()
+        child.wait()
+    # Still counted once the child has exited and been reaped
+    assert jobs.job_cpu_seconds() - before >= 0.5
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import database, models
+from app.auth import get_current_active_user, get_current_admin_user
+from app.main import app
+from benchmarks import generator
+
+
+@pytest.fixture
+def client(db):
+    admin = db.query(models.User).filter(models.User.role == "admin").first()
+    app.dependency_overrides[database.get_db] = lambda: db
+    app.dependency_overrides[get_current_active_user] = lambda: admin
+    app.dependency_overrides[get_current_admin_user] = lambda: admin
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def instance(db):
+    instance = generator.generate(20, seed=0)
+    generator.populate(db, instance)
+    return instance
+
+
+def test_schedule_filters_and_count(db, instance, client):
+    admin_id = instance["users"][0]["id"]
+    start = datetime(2025, 1, 1)
+    for i, (semester, status) in enumerate([
+        ("Spring 2025", "draft"), ("Spring 2025", "published"), ("Fall 2025", "published"), ("Spring 2025", "draft"),
+    ]):
+        db.add(models.Schedule(
+            semester=semester, status=status, generated_by=admin_id, created_at=start + timedelta(days=i)
+        ))
+    db.commit()
+
+    page = client.get("/api/schedules/", params={"status": "published", "limit": 1}).json()
+    assert [s["semester"] for s in page["items"]] == ["Fall 2025"]
+    assert page["next_cursor"] is not None
+    page = client.get("/api/schedules/", params={"status": "draft", "semester": "Spring 2025"}).json()
+    assert [s["status"] for s in page["items"]] == ["draft", "draft"]
+
+    assert client.get("/api/schedules/count").json() == {"count": 4}
+    assert client.get("/api/schedules/count", params={"status": "published"}).json() == {"count": 2}
+    assert client.get("/api/schedules/count", params={"semester": "Spring 2025", "status": "draft"}).json() == {"count": 2}
+
+
+def test_student_count(db, instance, client):
+    students = [user for user in instance["users"] if user["role"] == "student"]
+    db.query(models.User).filter(models.User.id == students[0]["id"]).update({"is_active": False})
+    db.commit()
+
+    assert client.get("/api/students/count").json() == {"count": len(students)}
+    assert client.get("/api/students/count", params={"is_active": True}).json() == {"count": len(students) - 1}
@@ -0,0 +1,79 @@
+import random
+from itertools import combinations
+
+from ortools.sat.python import cp_model
+
+from app.scheduler.model_builder import ModelBuilder, overlap_cliques
+
+
+def shift(day: int, start: int, end: int, required: int = 1):
+    """shift_info entry for a shift from start to end, in hours"""
+    return (required, (end - start) * 100, day, start * 60, end * 60)
+
+
+def brute_force_cliques(windows: dict):
+    """Maximal sets of pairwise-overlapping half-open windows, by enumeration"""
+    overlaps = lambda a, b: windows[a][0] < windows[b][1] and windows[b][0] < windows[a][1]
+    cliques = [
+        set(group) for size in range(2, len(windows) + 1) for group in combinations(windows, size)
+        if all(overlaps(a, b) for a, b in combinations(group, 2))
+    ]
+    return sorted(sorted(c) for c in cliques if not any(c < other for other in cliques))
+
+
+def test_overlap_cliques_are_the_maximal_cliques():
+    shift_info = {
+        "early": shift(0, 8, 12), "late": shift(0, 12, 16),  # Touching, not overlapping
+        "long": shift(0, 9, 15), "mid": shift(0, 10, 11), "other-day": shift(1, 9, 15),
+    }
+    assert {day: sorted(cliques) for day, cliques in overlap_cliques(shift_info).items()} == {
+        0: [["early", "long", "mid"], ["late", "long"]],
+    }
+
+    rnd = random.Random(0)
+    for _ in range(50):
+        windows = {}
+        for i in range(rnd.randint(2, 7)):
+            start = rnd.randint(0, 20)
+            windows[f"s{i}"] = (start, start + rnd.randint(1, 6))
+        shift_info = {shift_id: shift(0, start, end) for shift_id, (start, end) in windows.items()}
+        found = sorted(sorted(c) for c in overlap_cliques(shift_info).get(0, []))
+        assert found == brute_force_cliques(windows)
+
+
+def solve_single_student(shift_info: dict, max_per_day: int):
+    """Shifts the model gives one student available for every shift, with loose weekly caps"""
+    model = cp_model.CpModel()
+    builder = ModelBuilder(model, shift_info, {"s": (10, 80, max_per_day)})
+    builder.build([("s", shift_id, None) for shift_id in shift_info], ["s"])
+    solver = cp_model.CpSolver()
+    assert solver.Solve(model) == cp_model.OPTIMAL
+    return {shift_id for (_, shift_id), var in builder.assignments.items() if solver.Value(var)}
+
+
+def test_day_limits_cap_shifts_per_day_and_forbid_overlaps():
+    shift_info = {
+        "mon-1": shift(0, 8, 12), "mon-2": shift(0, 10, 14), "mon-3": shift(0, 14, 18), "mon-4": shift(0, 18, 22),
+        "tue-1": shift(1, 8, 12), "tue-2": shift(1, 12, 16),
+    }
+
+    chosen = solve_single_student(shift_info, max_per_day=1)
+    assert len(chosen) == 2
+    assert {shift_info[shift_id][2] for shift_id in chosen} == {0, 1}
+
+    chosen = solve_single_student(shift_info, max_per_day=3)
+    # Three Monday shifts fit only by skipping one of the overlapping pair
+    assert len(chosen) == 5
+    assert not {"mon-1", "mon-2"} <= chosen
+    assert {"mon-3", "mon-4", "tue-1", "tue-2"} <= chosen
+
+
+def test_day_limits_count_shifts_held_outside_the_model():
+    shift_info = {"mon-1": shift(0, 8, 12), "mon-2": shift(0, 12, 16), "tue-1": shift(1, 8, 12)}
+    model = cp_model.CpModel()
+    builder = ModelBuilder(model, shift_info, {"s": (10, 80, 2)}, fixed_load={"s": (1, 400, {0: 1})})
+    builder.build([("s", shift_id, None) for shift_id in shift_info], ["s"])
+    solver = cp_model.CpSolver()
+    assert solver.Solve(model) == cp_model.OPTIMAL
+    chosen = {shift_id for (_, shift_id), var in builder.assignments.items() if solver.Value(var)}
+    assert len(chosen & {"mon-1", "mon-2"}) == 1 and "tue-1" in chosen
@@ -0,0 +1,48 @@
+from datetime import time
+from types import SimpleNamespace
+
+from app.scheduler.pruning import prune_candidates
+
+SHIFTS = [
+    SimpleNamespace(id="weekday", shift_type="weekday", start_time=time(8), end_time=time(12)),
+    SimpleNamespace(id="weekend", shift_type="weekend", start_time=time(8), end_time=time(12)),
+    SimpleNamespace(id="rotating", shift_type="rotating", start_time=time(8), end_time=time(12)),
+    SimpleNamespace(id="double", shift_type="weekday", start_time=time(8), end_time=time(20)),
+]
+
+
+def preference(user_id: str, weekends: bool = False, rotating: bool = False, hours: float = 20):
+    return SimpleNamespace(
+        user_id=user_id, can_work_weekends=weekends, can_work_rotating=rotating, desired_hours_per_week=hours
+    )
+
+
+def rows_for(*students):
+    return [(student_id, shift.id, None) for student_id in students for shift in SHIFTS]
+
+
+def test_rows_are_pruned_by_reason():
+    # 6 desired hours x 1.5 allows shifts of up to 9 hours
+    preferences = [preference("strict", hours=6), preference("flexible", weekends=True, rotating=True, hours=20)]
+
+    kept, pruned = prune_candidates(rows_for("strict", "flexible"), SHIFTS, preferences)
+
+    assert sorted((s, shift_id) for s, shift_id, _ in kept) == [
+        ("flexible", "double"), ("flexible", "rotating"), ("flexible", "weekday"), ("flexible", "weekend"),
+        ("strict", "weekday"),
+    ]
+    assert pruned == {"weekend": 1, "rotating": 1, "hours": 1}
+
+
+def test_students_without_preferences_keep_every_row():
+    kept, pruned = prune_candidates(rows_for("undeclared"), SHIFTS, [])
+    assert len(kept) == len(SHIFTS)
+    assert sum(pruned.values()) == 0
+
+
+def test_hours_already_held_count_against_the_cap():
+    # 12 desired hours x 1.5 = 18; 8 held leave 10, too few for the 12-hour shift
+    preferences = [preference("s", weekends=True, rotating=True, hours=12)]
+    kept, pruned = prune_candidates(rows_for("s"), SHIFTS, preferences, fixed_load={"s": (2, 800, {})})
+    assert {shift_id for _, shift_id, _ in kept} == {"weekday", "weekend", "rotating"}
+    assert pruned == {"weekend": 0, "rotating": 0, "hours": 1}
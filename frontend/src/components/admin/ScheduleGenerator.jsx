@@ -2,9 +2,9 @@
 /**
  * Schedule Generator - Generate new schedules based on student availability
  */
-import { useState } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { PlayCircle, CheckCircle, AlertCircle, Eye } from 'lucide-react';
+import { PlayCircle, CheckCircle, AlertCircle, Eye, XCircle } from 'lucide-react';
 import { schedulesAPI } from '../../services/api';
 import Button from '../shared/Button';
 import Card from '../shared/Card';
@@ -17,6 +17,37 @@ const ScheduleGenerator = () => {
     const [generating, setGenerating] = useState(false);
     const [error, setError] = useState(null);
     const [result, setResult] = useState(null);
+    const [job, setJob] = useState(null);
+    const pollRef = useRef(null);
+
+    const JOB_POLL_INTERVAL_MS = 2000;
+
+    // Stop polling when the component unmounts
+    useEffect(() => () => clearTimeout(pollRef.current), []);
+
+    const pollJob = async (jobId) => {
+        try {
+            const response = await schedulesAPI.getJob(jobId);
+            const current = response.data;
+            setJob(current);
+
+            if (current.status === 'completed') {
+                const scheduleResponse = await schedulesAPI.get(current.schedule_id);
+                setResult(scheduleResponse.data);
+                setGenerating(false);
+            } else if (current.status === 'failed') {
+                setError(current.error || 'Failed to generate schedule. Please ensure students have submitted availability.');
+                setGenerating(false);
+            } else if (current.status === 'cancelled') {
+                setGenerating(false);
+            } else {
+                pollRef.current = setTimeout(() => pollJob(jobId), JOB_POLL_INTERVAL_MS);
+            }
+        } catch (err) {
+            setError(err.response?.data?.detail || 'Lost track of the generation job.');
+            setGenerating(false);
+        }
+    };
 
     const semesterOptions = [
         { value: 'Spring 2025', label: 'Spring 2025' },
@@ -36,14 +67,30 @@ const ScheduleGenerator = () => {
             setResult(null);
 
             const response = await schedulesAPI.generate(semester);
-            setResult(response.data);
+            setJob(response.data);
+            pollRef.current = setTimeout(() => pollJob(response.data.id), JOB_POLL_INTERVAL_MS);
         } catch (err) {
-            setError(err.response?.data?.detail || 'Failed to generate schedule. Please ensure students have submitted availability.');
-        } finally {
+            const detail = err.response?.data?.detail;
+            if (detail?.errors) {
+                // Rejected by the pre-queue check
+                setError(`${detail.message}: ${detail.errors.join('; ')}`);
+            } else {
+                setError(detail || 'Failed to generate schedule. Please ensure students have submitted availability.');
+            }
             setGenerating(false);
         }
     };
 
+    const handleCancel = async () => {
+        if (!job) return;
+        try {
+            const response = await schedulesAPI.cancelJob(job.id);
+            setJob(response.data);
+        } catch (err) {
+            setError(err.response?.data?.detail || 'Failed to cancel schedule generation');
+        }
+    };
+
     const handleViewSchedule = () => {
         if (result?.id) {
             navigate(`/admin/schedules/${result.id}`);
@@ -91,10 +138,28 @@ const ScheduleGenerator = () => {
                         <div className="bg-blue-50 p-4 rounded-lg">
                             <p className="text-sm text-blue-800">
                                 🔄 Analyzing student availability and preferences...
+                                {job?.stage && ` (${job.stage}, ${job.progress}%)`}
                             </p>
                             <p className="text-xs text-blue-600 mt-1">
                                 This may take a few moments depending on the number of shifts and students.
                             </p>
+                            <div className="mt-3">
+                                <Button
+                                    variant="secondary"
+                                    onClick={handleCancel}
+                                    disabled={!job || job.cancel_requested}
+                                >
+                                    <XCircle className="w-4 h-4 mr-2" />
+                                    {job?.cancel_requested ? 'Cancelling...' : 'Cancel'}
+                                </Button>
+                            </div>
+                        </div>
+                    )}
+
+                    {!generating && job?.status === 'cancelled' && (
+                        <div className="bg-yellow-50 p-4 rounded-lg flex items-center gap-2">
+                            <AlertCircle className="w-5 h-5 text-yellow-600" />
+                            <p className="text-sm text-yellow-800">Schedule generation was cancelled.</p>
                         </div>
                     )}
 
@@ -15,6 +15,8 @@ import ErrorMessage from '../shared/ErrorMessage';
 const ScheduleList = () => {
     const navigate = useNavigate();
     const [schedules, setSchedules] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [filteredSchedules, setFilteredSchedules] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
@@ -35,7 +37,8 @@ const ScheduleList = () => {
             setLoading(true);
             setError(null);
             const response = await schedulesAPI.list();
-            setSchedules(response.data);
+            setSchedules(response.data.items);
+            setNextCursor(response.data.next_cursor);
         } catch (err) {
             setError(err.response?.data?.detail || 'Failed to load schedules');
         } finally {
@@ -43,6 +46,19 @@ const ScheduleList = () => {
         }
     };
 
+    const loadMoreSchedules = async () => {
+        try {
+            setLoadingMore(true);
+            const response = await schedulesAPI.list({ cursor: nextCursor });
+            setSchedules(prev => [...prev, ...response.data.items]);
+            setNextCursor(response.data.next_cursor);
+        } catch (err) {
+            setError(err.response?.data?.detail || 'Failed to load schedules');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const filterSchedules = () => {
         let filtered = schedules;
 
@@ -201,6 +217,13 @@ const ScheduleList = () => {
                     onRowClick={(schedule) => navigate(`/admin/schedules/${schedule.id}`)}
                 />
             </div>
+            {nextCursor && (
+                <div className="flex justify-center">
+                    <Button variant="secondary" onClick={loadMoreSchedules} loading={loadingMore}>
+                        Load More
+                    </Button>
+                </div>
+            )}
 
             {/* Delete Confirmation Modal */}
             <Modal
@@ -15,6 +15,8 @@ import AddStudentModal from './AddStudentModal';
 
 const StudentManager = () => {
     const [students, setStudents] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [filteredStudents, setFilteredStudents] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
@@ -38,7 +40,8 @@ const StudentManager = () => {
             setLoading(true);
             setError(null);
             const response = await studentsAPI.list();
-            setStudents(response.data);
+            setStudents(response.data.items);
+            setNextCursor(response.data.next_cursor);
         } catch (err) {
             setError(err.response?.data?.detail || 'Failed to load students');
         } finally {
@@ -46,6 +49,19 @@ const StudentManager = () => {
         }
     };
 
+    const loadMoreStudents = async () => {
+        try {
+            setLoadingMore(true);
+            const response = await studentsAPI.list({ cursor: nextCursor });
+            setStudents(prev => [...prev, ...response.data.items]);
+            setNextCursor(response.data.next_cursor);
+        } catch (err) {
+            setError(err.response?.data?.detail || 'Failed to load students');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const filterStudents = () => {
         let filtered = students;
 
@@ -179,6 +195,13 @@ const StudentManager = () => {
                     onRowClick={handleRowClick}
                 />
             </div>
+            {nextCursor && (
+                <div className="flex justify-center">
+                    <Button variant="secondary" onClick={loadMoreStudents} loading={loadingMore}>
+                        Load More
+                    </Button>
+                </div>
+            )}
 
             {/* Student Detail Modal */}
             <Modal
@@ -29,28 +29,22 @@ const MySchedule = () => {
             setLoading(true);
             setError(null);
 
-            // Fetch all schedules and filter by current user
-            const response = await schedulesAPI.list();
+            // Get the most recent published schedule
+            const schedulesResponse = await schedulesAPI.list({ status: 'published', limit: 1 });
+            const publishedSchedules = schedulesResponse.data.items;
 
-            if (response.data && response.data.length > 0) {
-                // Get the most recent published schedule
-                const publishedSchedules = response.data.filter(s => s.status === 'published');
+            if (publishedSchedules.length > 0) {
+                const latestSchedule = publishedSchedules[0];
 
-                if (publishedSchedules.length > 0) {
-                    const latestSchedule = publishedSchedules[0];
+                // Fetch assignments for this schedule
+                const assignmentsResponse = await schedulesAPI.getAssignments(latestSchedule.id);
 
-                    // Fetch assignments for this schedule
-                    const assignmentsResponse = await schedulesAPI.getAssignments(latestSchedule.id);
+                // Filter assignments for current user
+                const myAssignments = assignmentsResponse.data.filter(
+                    a => a.user_id === user.id
+                );
 
-                    // Filter assignments for current user
-                    const myAssignments = assignmentsResponse.data.filter(
-                        a => a.user_id === user.id
-                    );
-
-                    setAssignments(myAssignments);
-                } else {
-                    setAssignments([]);
-                }
+                setAssignments(myAssignments);
             } else {
                 setAssignments([]);
             }
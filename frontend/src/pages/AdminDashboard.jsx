@@ -33,10 +33,13 @@ const AdminDashboardHome = () => {
         try {
             setLoading(true);
 
-            // Fetch students
-            const studentsResponse = await studentsAPI.list();
-            const totalStudents = studentsResponse.data.length;
-            const activeStudents = studentsResponse.data.filter(s => s.is_active).length;
+            // Count students
+            const [allResponse, activeResponse] = await Promise.all([
+                studentsAPI.count(),
+                studentsAPI.count({ is_active: true }),
+            ]);
+            const totalStudents = allResponse.data.count;
+            const activeStudents = activeResponse.data.count;
 
             // Fetch shifts
             const shiftsResponse = await shiftsAPI.list({ is_active: true });
@@ -37,9 +37,9 @@ const StudentDashboardHome = () => {
             const availResponse = await availabilityAPI.getMyAvailability(semester);
             const hasAvailability = availResponse.data && availResponse.data.length > 0;
 
-            // Fetch schedule assignments
-            const schedulesResponse = await schedulesAPI.list();
-            const publishedSchedules = schedulesResponse.data?.filter(s => s.status === 'published') || [];
+            // Fetch the latest published schedule's assignments
+            const schedulesResponse = await schedulesAPI.list({ status: 'published', limit: 1 });
+            const publishedSchedules = schedulesResponse.data.items;
 
             let upcomingCount = 0;
             let monthlyHours = 0;
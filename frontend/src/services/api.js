@@ -66,6 +66,7 @@ export const authAPI = {
 
 export const studentsAPI = {
     list: (params) => api.get('/students/', { params }),
+    count: (params) => api.get('/students/count', { params }),
     get: (studentId) => api.get(`/students/${studentId}`),
     update: (studentId, data) => api.put(`/students/${studentId}`, data),
     delete: (studentId) => api.delete(`/students/${studentId}`),
@@ -107,7 +108,7 @@ export const availabilityAPI = {
     delete: (availabilityId) => api.delete(`/availability/${availabilityId}`),
 
     // Admin
-    getSummary: (semester) => api.get(`/availability/summary/${semester}`),
+    getSummary: (semester, params) => api.get(`/availability/summary/${semester}`, { params }),
 };
 
 // ============================================
@@ -116,11 +117,15 @@ export const availabilityAPI = {
 
 export const schedulesAPI = {
     list: (params) => api.get('/schedules/', { params }),
+    count: (params) => api.get('/schedules/count', { params }),
     get: (scheduleId) => api.get(`/schedules/${scheduleId}`),
     create: (data) => api.post('/schedules/', data),
     update: (scheduleId, data) => api.put(`/schedules/${scheduleId}`, data),
     delete: (scheduleId) => api.delete(`/schedules/${scheduleId}`),
     generate: (semester) => api.post('/schedules/generate', { semester }),
+    getAssignments: (scheduleId, params) => api.get(`/schedules/${scheduleId}/assignments`, { params }),
+    getJob: (jobId) => api.get(`/schedules/jobs/${jobId}`),
+    cancelJob: (jobId) => api.post(`/schedules/jobs/${jobId}/cancel`),
     publish: (scheduleId) => api.post(`/schedules/${scheduleId}/publish`),
 };
 